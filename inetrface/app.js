@@ -6,6 +6,14 @@ let graphData = {
 let network = null;
 let communities = [];
 
+// Paquet précalculé (voir src/export_web.py)
+let bundle = null;
+let bundleBase = '';
+let bundleNodes = null;
+let bundleEdges = null;
+const bundleTiles = {};
+const expandedCommunities = new Set();
+
 // Couleurs pour les communautés (grayscale + accent)
 const COLORS = [
     '#1a1a1a', '#4a4a4a', '#7a7a7a', '#2d2d2d', '#5d5d5d',
@@ -15,6 +23,12 @@ const COLORS = [
 // === Initialisation ===
 document.addEventListener('DOMContentLoaded', function () {
     setupFileUpload();
+
+    // index.html?bundle=bundle charge un paquet précalculé au lieu d'un CSV
+    const bundleParam = new URLSearchParams(window.location.search).get('bundle');
+    if (bundleParam) {
+        loadBundle(bundleParam);
+    }
 });
 
 // === Gestion du fichier CSV ===
@@ -227,6 +241,184 @@ function renderGraph(nodes, edges) {
     });
 }
 
+// === Paquet précalculé (niveaux de détail) ===
+async function loadBundle(base) {
+    bundleBase = base.replace(/\/$/, '');
+
+    // Seul l'index (vue d'ensemble) est chargé au départ
+    const response = await fetch(`${bundleBase}/index.json`);
+    bundle = await response.json();
+
+    const principal = bundle.partitions[bundle.principal];
+    document.getElementById('statNodes').textContent = bundle.nb_noeuds;
+    document.getElementById('statEdges').textContent = bundle.nb_aretes;
+    document.getElementById('statCommunities').textContent = principal.nb_communautes;
+    document.getElementById('statModularity').textContent =
+        principal.modularite !== null ? principal.modularite.toFixed(3) : '-';
+
+    document.getElementById('fileInfo').style.display = 'flex';
+    document.getElementById('fileName').textContent = `${bundleBase} (${bundle.principal})`;
+    document.getElementById('uploadArea').style.display = 'none';
+    document.getElementById('statsSection').style.display = 'block';
+    document.getElementById('graphSection').style.display = 'block';
+
+    renderBundleOverview();
+}
+
+function renderBundleOverview() {
+    // Un noeud par communauté, à sa position précalculée
+    const nodes = bundle.supergraphe.noeuds.map(c => superNode(c.id));
+    renderFixedGraph(nodes, []);
+    refreshBundleEdges();
+
+    // Double-clic: ouvrir une communauté ou refermer celle d'un membre
+    network.on('doubleClick', function (params) {
+        if (params.nodes.length === 0) return;
+        const nodeId = params.nodes[0];
+        if (nodeId.startsWith('c')) {
+            expandCommunity(parseInt(nodeId.slice(1)));
+        } else {
+            collapseCommunity(bundleNodes.get(nodeId).communaute);
+        }
+    });
+
+    const legend = document.getElementById('legend');
+    legend.innerHTML = '<div class="legend-item"><span>Double-cliquez sur une communauté pour afficher ses membres</span></div>';
+}
+
+function superNode(id) {
+    const c = bundle.supergraphe.noeuds[id];
+    return {
+        id: `c${id}`,
+        label: `Communauté ${id + 1} (${c.taille})`,
+        x: c.x,
+        y: c.y,
+        value: c.taille,
+        color: COLORS[id % COLORS.length]
+    };
+}
+
+function renderFixedGraph(nodes, edges) {
+    // Positions déjà calculées: pas de stabilisation physique
+    const container = document.getElementById('graphContainer');
+    bundleNodes = new vis.DataSet(nodes);
+    bundleEdges = new vis.DataSet(edges);
+
+    const options = {
+        nodes: {
+            shape: 'dot',
+            scaling: { min: 8, max: 40 },
+            font: {
+                size: 14,
+                color: '#333333',
+                face: 'Segoe UI, sans-serif',
+                strokeWidth: 3,
+                strokeColor: '#ffffff'
+            },
+            borderWidth: 2
+        },
+        edges: {
+            scaling: { min: 1, max: 8 },
+            color: {
+                color: '#cccccc',
+                highlight: '#333333',
+                hover: '#999999'
+            },
+            smooth: false
+        },
+        physics: { enabled: false },
+        interaction: {
+            hover: true,
+            tooltipDelay: 100,
+            zoomView: true,
+            dragView: true
+        }
+    };
+
+    network = new vis.Network(container, { nodes: bundleNodes, edges: bundleEdges }, options);
+}
+
+function refreshBundleEdges() {
+    // Les arêtes visibles dépendent des communautés ouvertes: on calcule
+    // l'ensemble voulu, puis on retire et ajoute seulement la différence
+    // (vis-network ne retire pas les arêtes d'un noeud supprimé)
+    const wanted = new Map();
+
+    function addEdge(from, to, weight) {
+        const id = from < to ? `${from}|${to}` : `${to}|${from}`;
+        const edge = wanted.get(id);
+        if (edge) {
+            edge.value += weight;
+        } else {
+            wanted.set(id, { id, from, to, value: weight });
+        }
+    }
+
+    // Arêtes entre deux communautés fermées
+    for (const a of bundle.supergraphe.aretes) {
+        if (!expandedCommunities.has(a.source) && !expandedCommunities.has(a.cible)) {
+            addEdge(`c${a.source}`, `c${a.cible}`, a.poids);
+        }
+    }
+
+    for (const id of expandedCommunities) {
+        const tile = bundleTiles[id];
+
+        // Arêtes internes
+        for (const [a, b, weight] of tile.aretes) {
+            addEdge(`n${tile.noeuds[a].id}`, `n${tile.noeuds[b].id}`, weight);
+        }
+
+        // Liens vers les autres communautés: vers le membre si sa
+        // communauté est ouverte (vu des deux côtés, ajouté une fois),
+        // sinon vers la communauté fermée
+        for (const [a, node, community, weight] of tile.externes) {
+            if (!expandedCommunities.has(community)) {
+                addEdge(`n${tile.noeuds[a].id}`, `c${community}`, weight);
+            } else if (id < community) {
+                addEdge(`n${tile.noeuds[a].id}`, `n${node}`, weight);
+            }
+        }
+    }
+
+    const obsolete = bundleEdges.getIds().filter(id => !wanted.has(id));
+    bundleEdges.remove(obsolete);
+    bundleEdges.update(Array.from(wanted.values()));
+}
+
+async function expandCommunity(id) {
+    if (expandedCommunities.has(id)) return;
+
+    // Charger la tuile une seule fois
+    if (!bundleTiles[id]) {
+        const response = await fetch(`${bundleBase}/${bundle.tuiles[id].fichier}`);
+        bundleTiles[id] = await response.json();
+    }
+    const tile = bundleTiles[id];
+
+    expandedCommunities.add(id);
+    bundleNodes.remove(`c${id}`);
+    bundleNodes.add(tile.noeuds.map(n => ({
+        id: `n${n.id}`,
+        label: n.nom,
+        x: n.x,
+        y: n.y,
+        value: 1,
+        communaute: id,
+        color: COLORS[id % COLORS.length]
+    })));
+    refreshBundleEdges();
+}
+
+function collapseCommunity(id) {
+    if (!expandedCommunities.has(id)) return;
+
+    expandedCommunities.delete(id);
+    bundleNodes.remove(bundleTiles[id].noeuds.map(n => `n${n.id}`));
+    bundleNodes.add(superNode(id));
+    refreshBundleEdges();
+}
+
 // === Détection de communautés ===
 function detectCommunities(algorithm) {
     if (algorithm === 'louvain') {
@@ -559,24 +751,33 @@ function calculateModularity() {
     const m = graphData.edges.length;
     if (m === 0) return 0;
 
-    const adj = buildAdjacencyList();
-    let Q = 0;
-
-    for (const community of communities) {
-        const members = Array.from(community);
+    // Communauté de chaque noeud
+    const communityOf = {};
+    communities.forEach((community, c) => {
+        for (const node of community) {
+            communityOf[node] = c;
+        }
+    });
 
-        for (const i of members) {
-            for (const j of members) {
-                const aij = adj[i].includes(j) ? 1 : 0;
-                const ki = adj[i].length;
-                const kj = adj[j].length;
+    // Une seule passe sur les arêtes: arêtes internes et somme des degrés
+    // par communauté (Q = somme de L_c / m - (D_c / 2m)²)
+    const internal = new Array(communities.length).fill(0);
+    const degreeSum = new Array(communities.length).fill(0);
+
+    for (const e of graphData.edges) {
+        const cu = communityOf[e.from];
+        const cv = communityOf[e.to];
+        if (cu !== undefined) degreeSum[cu] += 1;
+        if (cv !== undefined) degreeSum[cv] += 1;
+        if (cu !== undefined && cu === cv) internal[cu] += 1;
+    }
 
-                Q += aij - (ki * kj) / (2 * m);
-            }
-        }
+    let Q = 0;
+    for (let c = 0; c < communities.length; c++) {
+        Q += internal[c] / m - Math.pow(degreeSum[c] / (2 * m), 2);
     }
 
-    return Q / (2 * m);
+    return Q;
 }
 
 // === Affichage ===
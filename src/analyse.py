@@ -7,55 +7,122 @@ Calcule les relations internes/externes et la densité de chaque communauté.
 import os
 import sys
 
+import numpy as np
+
 # Ajouter le chemin parent pour les imports
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from src.graphe import charger_graphe_complet
-from src.louvain import executer_louvain
+from src.graphe import charger_graphe_complet, construire_csr
+from src.modularite import NoyauModularite, labels_depuis_communautes
+from src.ecriture import apercu_membres, TOP_K
 
 
-def compter_aretes_internes(G, membres):
+def compter_aretes_internes(G, membres, pondere=False):
     """
     Compte les arêtes à l'intérieur d'une communauté.
     
     Arguments:
         G: le graphe
         membres: set des membres de la communauté
+        pondere: si True, somme les poids (nombre de relations fusionnées)
     
-    Retourne le nombre d'arêtes internes
+    Retourne le nombre d'arêtes internes (ou leur poids total)
     """
     count = 0
-    for u, v in G.edges():
+    for u, v, poids in G.edges(data='weight', default=1):
         if u in membres and v in membres:
-            count += 1
+            count += poids if pondere else 1
     return count
 
 
-def compter_aretes_externes(G, membres):
+def compter_aretes_externes(G, membres, pondere=False):
     """
     Compte les arêtes qui sortent d'une communauté.
     
     Arguments:
         G: le graphe
         membres: set des membres de la communauté
+        pondere: si True, somme les poids (nombre de relations fusionnées)
     
-    Retourne le nombre d'arêtes externes
+    Retourne le nombre d'arêtes externes (ou leur poids total)
     """
     count = 0
-    for u, v in G.edges():
+    for u, v, poids in G.edges(data='weight', default=1):
         # Une arête est externe si un seul des deux noeuds est dans la communauté
         u_dedans = u in membres
         v_dedans = v in membres
         if u_dedans != v_dedans:  # XOR: un seul est dedans
-            count += 1
+            count += poids if pondere else 1
     return count
 
 
-def calculer_densite(G, membres):
+def compter_aretes(G, membres):
+    """
+    Compte en une seule passe les arêtes internes et externes d'une communauté.
+    
+    Retourne: (aretes_internes, aretes_externes, poids_internes, poids_externes)
+    """
+    aretes_int = aretes_ext = poids_int = poids_ext = 0
+    for u, v, poids in G.edges(data='weight', default=1):
+        u_dedans = u in membres
+        v_dedans = v in membres
+        if u_dedans and v_dedans:
+            aretes_int += 1
+            poids_int += poids
+        elif u_dedans != v_dedans:
+            aretes_ext += 1
+            poids_ext += poids
+    return aretes_int, aretes_ext, poids_int, poids_ext
+
+
+def compter_aretes_par_communaute(indptr, indices, poids, labels, nb_communautes):
+    """
+    Compte les arêtes internes et externes de toutes les communautés à la fois.
+    
+    Chaque arête est prise une fois (u <= v dans le CSR). Les noeuds de
+    label -1 ne sont dans aucune communauté: une arête vers eux compte
+    seulement comme externe pour l'autre extrémité.
+    
+    Arguments:
+        indptr, indices, poids: le graphe au format CSR
+        labels: communauté de chaque noeud (-1 si aucune)
+        nb_communautes: nombre de communautés
+    
+    Retourne: (aretes_internes, aretes_externes, poids_internes, poids_externes),
+    quatre tableaux indexés par communauté
+    """
+    lignes = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+    une_fois = lignes <= indices
+    lu, lv, p = labels[lignes[une_fois]], labels[indices[une_fois]], poids[une_fois]
+    
+    # Poids entiers (relations comptées): on garde des entiers
+    if np.all(p == np.floor(p)):
+        p = p.astype(np.int64)
+    
+    # Arêtes internes: les deux extrémités dans la même communauté
+    internes = (lu == lv) & (lu >= 0)
+    aretes_int = np.bincount(lu[internes], minlength=nb_communautes)
+    poids_int = np.bincount(lu[internes], p[internes], minlength=nb_communautes).astype(p.dtype)
+    
+    # Arêtes externes: comptées pour chacune de leurs deux extrémités
+    externes = lu != lv
+    bouts = np.concatenate([lu[externes], lv[externes]])
+    poids_bouts = np.concatenate([p[externes], p[externes]])
+    places = bouts >= 0
+    aretes_ext = np.bincount(bouts[places], minlength=nb_communautes)
+    poids_ext = np.bincount(bouts[places], poids_bouts[places], minlength=nb_communautes).astype(p.dtype)
+    
+    return aretes_int, aretes_ext, poids_int, poids_ext
+
+
+def calculer_densite(G, membres, aretes_existantes=None):
     """
     Calcule la densité d'une communauté.
     
     Densité = arêtes existantes / arêtes possibles
     
+    Arguments:
+        aretes_existantes: nombre d'arêtes internes s'il est déjà connu
+    
     Retourne une valeur entre 0 et 1
     """
     n = len(membres)
@@ -66,21 +133,31 @@ def calculer_densite(G, membres):
     aretes_possibles = n * (n - 1) / 2
     
     # Nombre d'arêtes existantes
-    aretes_existantes = compter_aretes_internes(G, membres)
+    if aretes_existantes is None:
+        aretes_existantes = compter_aretes_internes(G, membres)
     
     densite = aretes_existantes / aretes_possibles
     return densite
 
 
-def analyser_communaute(G, membres, num):
+def analyser_communaute(G, membres, num, contribution=None, comptes=None):
     """
     Analyse une seule communauté.
     
+    Arguments:
+        G: le graphe
+        membres: set des membres de la communauté
+        num: numéro affiché de la communauté
+        contribution: part de la communauté dans la modularité (optionnelle)
+        comptes: (aretes_int, aretes_ext, poids_int, poids_ext) déjà calculés
+            (voir compter_aretes_par_communaute); sinon une passe sur les arêtes
+    
     Retourne un dictionnaire avec toutes les métriques
     """
-    aretes_int = compter_aretes_internes(G, membres)
-    aretes_ext = compter_aretes_externes(G, membres)
-    densite = calculer_densite(G, membres)
+    if comptes is None:
+        comptes = compter_aretes(G, membres)
+    aretes_int, aretes_ext, poids_int, poids_ext = comptes
+    densite = calculer_densite(G, membres, aretes_int)
     
     # Ratio interne/externe
     if aretes_ext > 0:
@@ -90,12 +167,16 @@ def analyser_communaute(G, membres, num):
     
     return {
         'numero': num,
+        'communaute': num - 1,  # même identifiant que dans la partition (à partir de 0)
         'taille': len(membres),
         'membres': sorted(membres),
         'aretes_internes': aretes_int,
         'aretes_externes': aretes_ext,
+        'poids_internes': poids_int,
+        'poids_externes': poids_ext,
         'ratio_int_ext': ratio,
-        'densite': densite
+        'densite': densite,
+        'modularite': contribution
     }
 
 
@@ -109,9 +190,17 @@ def analyser_toutes_communautes(G, communautes):
     
     Retourne une liste d'analyses
     """
+    # Comptes d'arêtes et contribution à la modularité de chaque communauté,
+    # vectorisés sur les labels du CSR
+    noeuds, indptr, indices, poids = construire_csr(G)
+    labels = labels_depuis_communautes(noeuds, communautes)
+    contributions = NoyauModularite(indptr, indices, poids).contributions(labels)
+    comptes = compter_aretes_par_communaute(indptr, indices, poids, labels, len(communautes))
+    comptes = list(zip(*(tableau.tolist() for tableau in comptes)))
+    
     analyses = []
     for i, membres in enumerate(communautes):
-        analyse = analyser_communaute(G, membres, i + 1)
+        analyse = analyser_communaute(G, membres, i + 1, float(contributions[i]), comptes[i])
         analyses.append(analyse)
     return analyses
 
@@ -122,20 +211,27 @@ def calculer_statistiques_globales(G, analyses):
     """
     total_internes = sum(a['aretes_internes'] for a in analyses)
     total_externes = sum(a['aretes_externes'] for a in analyses) // 2  # Divisé par 2 car comptées 2 fois
+    poids_internes = sum(a['poids_internes'] for a in analyses)
+    poids_externes = sum(a['poids_externes'] for a in analyses) // 2
     densite_moyenne = sum(a['densite'] for a in analyses) / len(analyses)
     
     return {
         'nb_communautes': len(analyses),
         'total_aretes_internes': total_internes,
         'total_aretes_externes': total_externes,
-        'densite_moyenne': densite_moyenne
+        'total_poids_internes': poids_internes,
+        'total_poids_externes': poids_externes,
+        'densite_moyenne': densite_moyenne,
+        'modularite': sum(a['modularite'] for a in analyses)
     }
 
 
-def afficher_analyse(analyses, stats_globales):
+def afficher_analyse(analyses, stats_globales, top_k=TOP_K):
     """
-    Affiche l'analyse de manière lisible.
+    Affiche l'analyse de manière lisible (seulement les top_k plus grandes communautés).
     """
+    plus_grandes = sorted(analyses, key=lambda a: -a['taille'])[:top_k]
+    
     print("\n")
     print("="*70)
     print("                    ANALYSE DES COMMUNAUTÉS")
@@ -143,13 +239,15 @@ def afficher_analyse(analyses, stats_globales):
     
     # Tableau par communauté
     print()
-    print(f"  {'Comm.':<8} {'Taille':<8} {'Internes':<10} {'Externes':<10} {'Densité':<10}")
-    print("  " + "-"*50)
+    print(f"  {'Comm.':<8} {'Taille':<8} {'Internes':<10} {'Externes':<10} {'Densité':<10} {'Part de Q':<10}")
+    print("  " + "-"*60)
     
-    for a in analyses:
-        print(f"  {a['numero']:<8} {a['taille']:<8} {a['aretes_internes']:<10} {a['aretes_externes']:<10} {a['densite']:<10.2f}")
+    for a in plus_grandes:
+        print(f"  {a['numero']:<8} {a['taille']:<8} {a['aretes_internes']:<10} {a['aretes_externes']:<10} {a['densite']:<10.2f} {a['modularite']:<+10.4f}")
     
-    print("  " + "-"*50)
+    if len(analyses) > top_k:
+        print(f"  ... et {len(analyses) - top_k} autre(s) communauté(s)")
+    print("  " + "-"*60)
     
     # Statistiques globales
     print()
@@ -158,7 +256,10 @@ def afficher_analyse(analyses, stats_globales):
     print(f"  Nombre de communautés:      {stats_globales['nb_communautes']}")
     print(f"  Total arêtes internes:      {stats_globales['total_aretes_internes']}")
     print(f"  Total arêtes externes:      {stats_globales['total_aretes_externes']}")
+    print(f"  Poids interne (relations):  {stats_globales['total_poids_internes']}")
+    print(f"  Poids externe (relations):  {stats_globales['total_poids_externes']}")
     print(f"  Densité moyenne:            {stats_globales['densite_moyenne']:.2f}")
+    print(f"  Modularité:                 {stats_globales['modularite']:.4f}")
     print("  " + "-"*50)
     
     # Interprétation
@@ -183,24 +284,27 @@ def afficher_analyse(analyses, stats_globales):
     print()
     print("  DÉTAILS PAR COMMUNAUTÉ:")
     print("  " + "-"*50)
-    for a in analyses:
-        print(f"\n  Communauté {a['numero']}: {a['membres']}")
+    for a in plus_grandes:
+        print(f"\n  Communauté {a['numero']}: [{apercu_membres(a['membres'])}]")
     
     print()
 
 
-def executer_analyse(G, communautes):
+def executer_analyse(G, communautes, silencieux=False, top_k=TOP_K):
     """
     Fonction principale: analyse les communautés et affiche les résultats.
     """
     analyses = analyser_toutes_communautes(G, communautes)
     stats = calculer_statistiques_globales(G, analyses)
-    afficher_analyse(analyses, stats)
+    if not silencieux:
+        afficher_analyse(analyses, stats, top_k)
     return analyses, stats
 
 
 # === Test du module ===
 if __name__ == "__main__":
+    from src.louvain import executer_louvain
+    
     # Chemin vers les données
     chemin = os.path.join(os.path.dirname(__file__), "..", "data", "reseau_amis.csv")
     
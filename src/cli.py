@@ -0,0 +1,373 @@
+# -*- coding: utf-8 -*-
+"""
+Point d'entrée unique en ligne de commande.
+
+Utilisation (depuis la racine du projet):
+    python -m src.cli info data/reseau_amis.csv
+    python -m src.cli louvain data/reseau_amis.csv
+    python -m src.cli girvan-newman data/reseau_amis.csv -k 5
+    python -m src.cli compare data/reseau_amis.csv -k 5
+
+Chaque sous-commande importe seulement ce dont elle a besoin: "info" n'utilise
+que numpy, et matplotlib n'est chargé que par "render".
+"""
+
+import time
+
+# Au plus tôt: sert de repère si le lancement du processus est inconnu
+DEBUT_IMPORT = time.perf_counter()
+
+import argparse
+import os
+
+from src.ecriture import TOP_K
+
+
+# Objectif de durée totale (temps réel, du lancement de python à la fin)
+# des sous-commandes légères (--help, info) sur le jeu de données fourni
+OBJECTIF_DEMARRAGE_MS = 400
+
+
+def duree_depuis_lancement():
+    """
+    Retourne le temps réel écoulé depuis le lancement du processus, en
+    secondes, démarrage de l'interpréteur compris (None si inconnu).
+
+    Lu dans /proc (Linux), à la résolution d'un tick d'horloge (10 ms).
+    """
+    try:
+        with open('/proc/self/stat') as f:
+            champs = f.read().rsplit(')', 1)[1].split()
+        with open('/proc/uptime') as f:
+            maintenant = float(f.read().split()[0])
+        lancement = int(champs[19]) / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+    return maintenant - lancement
+
+
+def fichier_resultats(chemin):
+    """
+    Type de l'option --sortie: vérifie le format dès la lecture des
+    arguments, pour ne pas découvrir après la détection qu'il est impossible.
+    """
+    from src.ecriture import verifier_format
+
+    try:
+        verifier_format(chemin)
+    except (ValueError, ImportError) as erreur:
+        raise argparse.ArgumentTypeError(str(erreur))
+    return chemin
+
+
+def ecrire_sortie(args, partition=None, analyses=None, stats=None):
+    """
+    Écrit les résultats dans le fichier --sortie (s'il est demandé).
+    """
+    if args.sortie is None:
+        return
+
+    from src.ecriture import EcrivainResultats
+
+    with EcrivainResultats(args.sortie) as ecrivain:
+        if stats is not None:
+            ecrivain.ecrire_statistiques(stats)
+        if analyses is not None:
+            ecrivain.ecrire_communautes(analyses)
+        if partition is not None:
+            ecrivain.ecrire_partition(partition)
+
+    if not args.silencieux:
+        print(f"  ✓ Résultats écrits: {args.sortie}")
+
+
+def commande_info(args):
+    """
+    Affiche les statistiques du graphe (sans pandas ni networkx).
+    """
+    from src.graphe import charger_aretes, construire_csr_depuis_aretes
+    from src.statistiques import calculer_degres, calculer_statistiques, afficher_statistiques
+
+    noeuds, sources, cibles = charger_aretes(args.chemin, args.silencieux)
+    indptr, indices, poids = construire_csr_depuis_aretes(len(noeuds), sources, cibles, args.boucles)
+    degres = calculer_degres(indptr, indices)
+    stats = calculer_statistiques(indptr, indices, degres, rapide=args.rapide)
+    if not args.silencieux:
+        afficher_statistiques(stats, noeuds, degres, args.top_k)
+    ecrire_sortie(args, stats=stats)
+
+
+def commande_louvain(args):
+    """
+    Détecte les communautés avec Louvain.
+    """
+    from src.graphe import charger_graphe_complet
+    from src.louvain import executer_louvain, afficher_dendrogramme
+
+    G = charger_graphe_complet(args.chemin, args.boucles, args.silencieux)
+    partition, modularite, communautes, dendrogramme = executer_louvain(
+        G, args.silencieux, args.top_k, garder_dendrogramme=True)
+    if args.niveaux and not args.silencieux:
+        afficher_dendrogramme(dendrogramme)
+    ecrire_sortie(args, partition, stats={'algorithme': 'louvain', 'modularite': modularite,
+                                          'nb_communautes': len(communautes),
+                                          'nb_niveaux': dendrogramme.nb_niveaux})
+
+
+def commande_girvan_newman(args):
+    """
+    Détecte les communautés avec Girvan-Newman.
+    """
+    from src.graphe import charger_graphe_complet
+    from src.girvan_newman import executer_girvan_newman
+
+    G = charger_graphe_complet(args.chemin, args.boucles, args.silencieux)
+    partition, modularite, communautes = executer_girvan_newman(
+        G, args.k, args.temps_max, args.checkpoint, args.silencieux, args.top_k)
+    ecrire_sortie(args, partition, stats={'algorithme': 'girvan_newman', 'modularite': modularite,
+                                          'nb_communautes': len(communautes)})
+
+
+def commande_propagation(args):
+    """
+    Détecte les communautés par propagation de labels.
+    """
+    from src.graphe import charger_graphe_complet
+    from src.propagation import executer_propagation
+
+    G = charger_graphe_complet(args.chemin, args.boucles, args.silencieux)
+    partition, modularite, communautes = executer_propagation(
+        G, args.silencieux, args.top_k, semi_synchrone=args.semi_synchrone, nb_processus=args.processus)
+    ecrire_sortie(args, partition, stats={'algorithme': 'propagation', 'modularite': modularite,
+                                          'nb_communautes': len(communautes)})
+
+
+def commande_analyse(args):
+    """
+    Détecte les communautés avec Louvain puis les analyse.
+    """
+    from src.graphe import charger_graphe_complet
+    from src.louvain import executer_louvain
+    from src.analyse import executer_analyse
+
+    G = charger_graphe_complet(args.chemin, args.boucles, args.silencieux)
+    partition, modularite, communautes = executer_louvain(G, args.silencieux, args.top_k)
+    analyses, stats = executer_analyse(G, communautes, args.silencieux, args.top_k)
+    ecrire_sortie(args, partition, analyses, stats)
+
+
+def commande_compare(args):
+    """
+    Compare les algorithmes de détection.
+    """
+    from src.graphe import charger_graphe_complet
+    from src.comparaison import executer_comparaison
+
+    G = charger_graphe_complet(args.chemin, args.boucles)
+    executer_comparaison(G, args.k)
+
+
+def commande_render(args):
+    """
+    Génère les images du graphe et des communautés.
+    """
+    from src.graphe import charger_graphe_complet
+    from src.louvain import executer_louvain
+    from src.girvan_newman import executer_girvan_newman
+    from src.visualisation import generer_toutes_visualisations, afficher_images
+
+    G = charger_graphe_complet(args.chemin, args.boucles)
+    partition_l, mod_l, comm_l = executer_louvain(G)
+    partition_gn, mod_gn, comm_gn = executer_girvan_newman(G, args.k)
+    generer_toutes_visualisations(G, partition_l, partition_gn, sauvegarder=True)
+
+    if args.afficher:
+        afficher_images()
+
+
+def commande_export_web(args):
+    """
+    Exporte le paquet à niveaux de détail chargé par l'interface web.
+    """
+    from src.graphe import charger_graphe_complet
+    from src.louvain import executer_louvain
+    from src.girvan_newman import executer_girvan_newman
+    from src.export_web import exporter_bundle
+
+    G = charger_graphe_complet(args.chemin, args.boucles)
+    partition_l, mod_l, comm_l = executer_louvain(G, silencieux=True)
+    partitions = {'louvain': partition_l}
+    modularites = {'louvain': mod_l}
+
+    if args.k is not None:
+        partition_gn, mod_gn, comm_gn = executer_girvan_newman(G, k=args.k, silencieux=True)
+        partitions['girvan_newman'] = partition_gn
+        modularites['girvan_newman'] = mod_gn
+
+    exporter_bundle(G, partitions, args.dossier, modularites=modularites)
+
+
+def commande_index(args):
+    """
+    Construit l'index des communautés de Louvain pour les requêtes par utilisateur.
+    """
+    from src.graphe import charger_graphe_complet
+    from src.louvain import executer_louvain
+    from src.index_communautes import construire_index
+
+    G = charger_graphe_complet(args.chemin, args.boucles)
+    partition, modularite, communautes = executer_louvain(G, silencieux=True)
+    construire_index(G, partition, args.dossier, 'louvain', modularite)
+
+
+def commande_requete(args):
+    """
+    Interroge un index de communautés (numpy seulement, sans recharger le graphe).
+    """
+    from src.index_communautes import IndexCommunautes, afficher_requete
+
+    index = IndexCommunautes(args.dossier)
+    for nom in args.utilisateurs:
+        afficher_requete(index, nom)
+
+
+def commande_fenetres(args):
+    """
+    Détecte les communautés par fenêtres de temps glissantes.
+    """
+    from src.fenetres import executer_fenetres, sauvegarder_serie
+
+    serie = executer_fenetres(args.chemin, args.colonne_temps, args.taille, args.pas, args.silencieux,
+                              args.boucles)
+    if args.sortie is not None:
+        sauvegarder_serie(serie, args.sortie, args.silencieux)
+
+
+def commande_lot(args):
+    """
+    Traite de nombreux fichiers CSV avec un pool de processus.
+    """
+    from src.lot import executer_lot
+
+    executer_lot(args.entree, args.sortie, args.processus, args.cache, args.rendu, args.boucles)
+
+
+def creer_parser():
+    """
+    Construit le parser avec toutes les sous-commandes.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m src.cli",
+        description="Détection de communautés dans un réseau d'amis"
+    )
+    parser.add_argument("--temps", action="store_true",
+                        help=f"affiche la durée totale depuis le lancement de python "
+                             f"(objectif info: < {OBJECTIF_DEMARRAGE_MS} ms)")
+    parser.add_argument("--boucles", choices=["supprimer", "conserver"], default="supprimer",
+                        help="traitement des relations d'un utilisateur avec lui-même")
+    sous_parsers = parser.add_subparsers(dest="commande", required=True)
+
+    # Options de sortie communes aux commandes qui produisent des résultats
+    sortie = argparse.ArgumentParser(add_help=False)
+    sortie.add_argument("--sortie", default=None, type=fichier_resultats,
+                        help="fichier de résultats structurés (.jsonl, .parquet ou .bin)")
+    sortie.add_argument("--top-k", type=int, default=TOP_K, help="nombre d'éléments affichés en console")
+    sortie.add_argument("--silencieux", action="store_true", help="n'affiche pas les résultats")
+
+    p = sous_parsers.add_parser("info", parents=[sortie], help="statistiques du graphe")
+    p.add_argument("chemin", help="fichier CSV des relations")
+    p.add_argument("--rapide", action="store_true",
+                   help="seulement les métriques peu coûteuses (sans composantes, clustering ni diamètre)")
+    p.set_defaults(fonction=commande_info)
+
+    p = sous_parsers.add_parser("louvain", parents=[sortie], help="communautés avec Louvain")
+    p.add_argument("chemin", help="fichier CSV des relations")
+    p.add_argument("--niveaux", action="store_true", help="affiche chaque niveau de la hiérarchie")
+    p.set_defaults(fonction=commande_louvain)
+
+    p = sous_parsers.add_parser("girvan-newman", parents=[sortie], help="communautés avec Girvan-Newman")
+    p.add_argument("chemin", help="fichier CSV des relations")
+    p.add_argument("-k", type=int, default=None, help="nombre de communautés souhaité")
+    p.add_argument("--temps-max", type=float, default=None, help="durée maximale en secondes")
+    p.add_argument("--checkpoint", default=None, help="fichier de reprise")
+    p.set_defaults(fonction=commande_girvan_newman)
+
+    p = sous_parsers.add_parser("propagation", parents=[sortie], help="communautés par propagation de labels")
+    p.add_argument("chemin", help="fichier CSV des relations")
+    p.add_argument("--semi-synchrone", action="store_true", help="mise à jour par classes de couleur")
+    p.add_argument("--processus", type=int, default=1, help="nombre de processus (mode semi-synchrone)")
+    p.set_defaults(fonction=commande_propagation)
+
+    p = sous_parsers.add_parser("analyse", parents=[sortie], help="analyse des communautés de Louvain")
+    p.add_argument("chemin", help="fichier CSV des relations")
+    p.set_defaults(fonction=commande_analyse)
+
+    p = sous_parsers.add_parser("compare", help="comparaison des algorithmes")
+    p.add_argument("chemin", help="fichier CSV des relations")
+    p.add_argument("-k", type=int, default=None, help="nombre de communautés pour Girvan-Newman")
+    p.set_defaults(fonction=commande_compare)
+
+    p = sous_parsers.add_parser("render", help="images du graphe et des communautés")
+    p.add_argument("chemin", help="fichier CSV des relations")
+    p.add_argument("-k", type=int, default=None, help="nombre de communautés pour Girvan-Newman")
+    p.add_argument("--afficher", action="store_true", help="ouvrir les images à la fin")
+    p.set_defaults(fonction=commande_render)
+
+    p = sous_parsers.add_parser("export-web", help="paquet précalculé pour l'interface web")
+    p.add_argument("chemin", help="fichier CSV des relations")
+    p.add_argument("--dossier", default="inetrface/bundle", help="dossier de sortie")
+    p.add_argument("-k", type=int, default=None,
+                   help="ajoute aussi la partition Girvan-Newman en k communautés")
+    p.set_defaults(fonction=commande_export_web)
+
+    p = sous_parsers.add_parser("index", help="index des communautés pour les requêtes par utilisateur")
+    p.add_argument("chemin", help="fichier CSV des relations")
+    p.add_argument("--dossier", default="resultats/index", help="dossier de l'index")
+    p.set_defaults(fonction=commande_index)
+
+    p = sous_parsers.add_parser("requete", help="communauté et amis d'utilisateurs, depuis un index")
+    p.add_argument("utilisateurs", nargs="+", help="noms des utilisateurs")
+    p.add_argument("--dossier", default="resultats/index", help="dossier de l'index")
+    p.set_defaults(fonction=commande_requete)
+
+    p = sous_parsers.add_parser("fenetres", help="communautés par fenêtres de temps glissantes")
+    p.add_argument("chemin", help="fichier CSV des relations datées")
+    p.add_argument("--colonne-temps", default="date", help="colonne des dates de création")
+    p.add_argument("--taille", default="7D", help="durée d'une fenêtre (ex: 7D, 30D)")
+    p.add_argument("--pas", default=None, help="décalage entre fenêtres (par défaut: la taille)")
+    p.add_argument("--sortie", default=None, help="fichier .npz de la série de partitions")
+    p.add_argument("--silencieux", action="store_true", help="n'affiche pas les fenêtres")
+    p.set_defaults(fonction=commande_fenetres)
+
+    p = sous_parsers.add_parser("lot", help="traitement de nombreux fichiers CSV")
+    p.add_argument("entree", help="dossier ou motif glob des fichiers CSV")
+    p.add_argument("--sortie", default="resultats/lot.csv", help="fichier de résumé (.csv ou .jsonl)")
+    p.add_argument("--processus", type=int, default=None, help="nombre de processus")
+    p.add_argument("--cache", default="resultats/cache", help="dossier du cache")
+    p.add_argument("--rendu", action="store_true", help="générer une image par graphe")
+    p.set_defaults(fonction=commande_lot)
+
+    return parser
+
+
+def main(argv=None):
+    """
+    Analyse les arguments et lance la sous-commande.
+    """
+    args = creer_parser().parse_args(argv)
+    args.fonction(args)
+
+    if args.temps:
+        duree = duree_depuis_lancement()
+        if duree is not None:
+            print(f"\n  Durée: {duree * 1000:.0f} ms depuis le lancement de python")
+        else:
+            duree = time.perf_counter() - DEBUT_IMPORT
+            print(f"\n  Durée: {duree * 1000:.0f} ms (sans le démarrage de l'interpréteur)")
+
+        if args.commande == 'info' and duree * 1000 > OBJECTIF_DEMARRAGE_MS:
+            print(f"  ⚠ Objectif de {OBJECTIF_DEMARRAGE_MS} ms dépassé")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,18 @@
 # -*- coding: utf-8 -*-
 """
-Module de comparaison des algorithmes Louvain et Girvan-Newman.
-Compare les performances et résultats des deux algorithmes.
+Module de comparaison des algorithmes Louvain, Girvan-Newman et propagation de labels.
+Compare les performances et résultats des trois algorithmes.
 """
 
+import math
 import time
 import os
 import sys
+from functools import partial
 
 # Ajouter le chemin parent pour les imports
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from src.graphe import charger_graphe_complet
-from src.louvain import executer_louvain
-from src.girvan_newman import executer_girvan_newman
 
 
 def mesurer_temps(fonction, *args):
@@ -28,16 +28,22 @@ def mesurer_temps(fonction, *args):
     return resultat, temps
 
 
-def comparer_algorithmes(G, k=None):
+def comparer_algorithmes(G, k=None, silencieux=False):
     """
-    Compare Louvain et Girvan-Newman sur le même graphe.
+    Compare Louvain, Girvan-Newman et la propagation de labels sur le même graphe.
     
     Arguments:
         G: le graphe à analyser
         k: nombre de communautés pour Girvan-Newman (optionnel)
+        silencieux: si True, n'affiche pas les communautés de chaque algorithme
     
     Retourne un dictionnaire avec les résultats
     """
+    # Les algorithmes ne sont importés qu'au moment de les comparer
+    from src.louvain import executer_louvain
+    from src.girvan_newman import executer_girvan_newman
+    from src.propagation import executer_propagation
+    
     resultats = {}
     
     # === Louvain ===
@@ -45,7 +51,7 @@ def comparer_algorithmes(G, k=None):
     print("          ALGORITHME DE LOUVAIN")
     print("="*60)
     
-    (partition_l, mod_l, comm_l), temps_l = mesurer_temps(executer_louvain, G)
+    (partition_l, mod_l, comm_l), temps_l = mesurer_temps(partial(executer_louvain, silencieux=silencieux), G)
     
     resultats['louvain'] = {
         'partition': partition_l,
@@ -60,7 +66,8 @@ def comparer_algorithmes(G, k=None):
     print("          ALGORITHME DE GIRVAN-NEWMAN")
     print("="*60)
     
-    (partition_gn, mod_gn, comm_gn), temps_gn = mesurer_temps(executer_girvan_newman, G, k)
+    (partition_gn, mod_gn, comm_gn), temps_gn = mesurer_temps(
+        partial(executer_girvan_newman, k=k, silencieux=silencieux), G)
     
     resultats['girvan_newman'] = {
         'partition': partition_gn,
@@ -70,6 +77,21 @@ def comparer_algorithmes(G, k=None):
         'temps': temps_gn
     }
     
+    # === Propagation de labels ===
+    print("\n" + "="*60)
+    print("          PROPAGATION DE LABELS")
+    print("="*60)
+    
+    (partition_p, mod_p, comm_p), temps_p = mesurer_temps(partial(executer_propagation, silencieux=silencieux), G)
+    
+    resultats['propagation'] = {
+        'partition': partition_p,
+        'modularite': mod_p,
+        'communautes': comm_p,
+        'nb_communautes': len(comm_p),
+        'temps': temps_p
+    }
+    
     return resultats
 
 
@@ -85,54 +107,62 @@ def calculer_taille_moyenne(communautes):
 
 def afficher_comparaison(resultats):
     """
-    Affiche un tableau comparatif des deux algorithmes.
+    Affiche un tableau comparatif des trois algorithmes.
     """
     louvain = resultats['louvain']
     gn = resultats['girvan_newman']
+    prop = resultats['propagation']
     
     # Calculer les tailles moyennes
     taille_l = calculer_taille_moyenne(louvain['communautes'])
     taille_gn = calculer_taille_moyenne(gn['communautes'])
+    taille_p = calculer_taille_moyenne(prop['communautes'])
     
     print("\n")
-    print("="*70)
+    print("="*78)
     print("                    COMPARAISON DES ALGORITHMES")
-    print("="*70)
+    print("="*78)
     print()
-    print(f"  {'Métrique':<30} {'Louvain':>15} {'Girvan-Newman':>15}")
-    print("  " + "-"*60)
-    print(f"  {'Complexité':<30} {'O(n log n)':>15} {'O(m²n)':>15}")
-    print(f"  {'Modularité':<30} {louvain['modularite']:>15.4f} {gn['modularite']:>15.4f}")
-    print(f"  {'Nombre de communautés':<30} {louvain['nb_communautes']:>15} {gn['nb_communautes']:>15}")
-    print(f"  {'Taille moyenne':<30} {taille_l:>15.1f} {taille_gn:>15.1f}")
-    print(f"  {'Temps exécution (s)':<30} {louvain['temps']:>15.4f} {gn['temps']:>15.4f}")
-    print("  " + "-"*60)
+    print(f"  {'Métrique':<25} {'Louvain':>15} {'Girvan-Newman':>15} {'Propagation':>15}")
+    print("  " + "-"*72)
+    print(f"  {'Complexité':<25} {'O(n log n)':>15} {'O(m²n)':>15} {'O(m)':>15}")
+    print(f"  {'Modularité':<25} {louvain['modularite']:>15.4f} {gn['modularite']:>15.4f} {prop['modularite']:>15.4f}")
+    print(f"  {'Nombre de communautés':<25} {louvain['nb_communautes']:>15} {gn['nb_communautes']:>15} {prop['nb_communautes']:>15}")
+    print(f"  {'Taille moyenne':<25} {taille_l:>15.1f} {taille_gn:>15.1f} {taille_p:>15.1f}")
+    print(f"  {'Temps exécution (s)':<25} {louvain['temps']:>15.4f} {gn['temps']:>15.4f} {prop['temps']:>15.4f}")
+    print("  " + "-"*72)
     print()
     print("  n = nombre de noeuds, m = nombre d'arêtes")
-    print("  " + "-"*60)
+    print("  " + "-"*72)
     
     # Déterminer le meilleur
     print()
     print("  ANALYSE:")
-    print("  " + "-"*60)
+    print("  " + "-"*72)
     
-    # Meilleure modularité
-    if louvain['modularite'] > gn['modularite']:
-        print("  ✓ Louvain a une meilleure modularité")
-    elif gn['modularite'] > louvain['modularite']:
-        print("  ✓ Girvan-Newman a une meilleure modularité")
-    else:
-        print("  = Modularité identique")
+    noms = {
+        'louvain': 'Louvain',
+        'girvan_newman': 'Girvan-Newman',
+        'propagation': 'Propagation de labels'
+    }
     
-    # Plus rapide
-    if louvain['temps'] < gn['temps']:
-        ratio = gn['temps'] / louvain['temps']
-        print(f"  ✓ Louvain est {ratio:.1f}x plus rapide")
+    # Meilleure modularité (plusieurs algorithmes peuvent être ex aequo, aux
+    # erreurs d'arrondi près quand ils trouvent la même partition)
+    meilleure = max(resultats[cle]['modularite'] for cle in noms)
+    ex_aequo = [noms[cle] for cle in noms
+                if math.isclose(resultats[cle]['modularite'], meilleure, rel_tol=1e-9, abs_tol=1e-12)]
+    if len(ex_aequo) == len(noms):
+        print("  = Modularité identique")
     else:
-        ratio = louvain['temps'] / gn['temps']
-        print(f"  ✓ Girvan-Newman est {ratio:.1f}x plus rapide")
+        print(f"  ✓ Meilleure modularité: {', '.join(ex_aequo)}")
+    
+    # Plus rapide (comparé au plus lent)
+    plus_rapide = min(noms, key=lambda cle: resultats[cle]['temps'])
+    plus_lent = max(noms, key=lambda cle: resultats[cle]['temps'])
+    ratio = resultats[plus_lent]['temps'] / max(resultats[plus_rapide]['temps'], 1e-9)
+    print(f"  ✓ Plus rapide: {noms[plus_rapide]} ({ratio:.1f}x plus rapide que {noms[plus_lent]})")
     
-    print("="*70)
+    print("="*78)
     
     return resultats
 
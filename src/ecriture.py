@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+"""
+Module d'écriture des résultats.
+Résumé court en console et écriture structurée (JSONL, Parquet, binaire) par lots.
+"""
+
+import heapq
+import importlib.util
+import json
+import math
+import os
+import struct
+
+
+# Nombre de communautés (ou d'utilisateurs) affichés par défaut en console
+TOP_K = 10
+
+# Nombre de membres montrés pour chaque communauté du résumé
+NB_MEMBRES_APERCU = 8
+
+# En-tête et types de blocs du format binaire
+ENTETE_BINAIRE = b'SNCD\x01'
+TYPES_BLOCS = {'partition': b'P', 'communautes': b'C', 'graphe': b'G'}
+
+
+def apercu_membres(membres, nb=NB_MEMBRES_APERCU):
+    """
+    Retourne un aperçu court des membres: les premiers, puis "... (+N)".
+    """
+    premiers = heapq.nsmallest(nb, membres)
+    texte = ", ".join(str(m) for m in premiers)
+    if len(membres) > nb:
+        texte += f", ... (+{len(membres) - nb})"
+    return texte
+
+
+def afficher_resume_communautes(communautes, titre, top_k=TOP_K):
+    """
+    Affiche le nombre de communautés et seulement les top_k plus grandes.
+
+    Arguments:
+        communautes: liste de sets [{membres_1}, {membres_2}, ...]
+        titre: titre du bloc (ex: "COMMUNAUTÉS DÉTECTÉES (LOUVAIN)")
+        top_k: nombre de communautés affichées
+    """
+    print("\n" + "="*50)
+    print(f"   {titre}")
+    print("="*50)
+    print(f"\n  Nombre de communautés: {len(communautes)}\n")
+
+    # Les plus grandes d'abord (à taille égale, dans l'ordre de numérotation)
+    ordre = sorted(range(len(communautes)), key=lambda i: -len(communautes[i]))
+    for i in ordre[:top_k]:
+        membres = communautes[i]
+        print(f"  Communauté {i+1} ({len(membres)}): [{apercu_membres(membres)}]")
+
+    if len(communautes) > top_k:
+        print(f"\n  ... et {len(communautes) - top_k} autre(s) communauté(s)")
+
+    print("="*50)
+
+
+def _en_python(valeur):
+    """
+    Convertit les scalaires numpy en types Python (pour JSON).
+
+    Les flottants non finis (ex: ratio infini d'une communauté sans arête
+    externe) deviennent None: NaN et Infinity ne sont pas du JSON valide.
+    """
+    if hasattr(valeur, 'item'):
+        valeur = valeur.item()
+    if isinstance(valeur, float) and not math.isfinite(valeur):
+        return None
+    return valeur
+
+
+def verifier_format(chemin, format=None):
+    """
+    Vérifie qu'un fichier de résultats pourra être écrit, sans rien écrire.
+
+    Permet de refuser une sortie impossible (format inconnu, pyarrow absent)
+    avant de lancer un long calcul.
+
+    Retourne le format ('jsonl', 'parquet' ou 'binaire'), déduit de
+    l'extension si format est None
+    """
+    if format is None:
+        format = {'.jsonl': 'jsonl', '.parquet': 'parquet', '.bin': 'binaire'}.get(
+            os.path.splitext(chemin)[1], 'jsonl')
+    if format not in ('jsonl', 'parquet', 'binaire'):
+        raise ValueError(f"Format inconnu: {format!r} (jsonl, parquet ou binaire)")
+
+    # Présence de pyarrow vérifiée sans l'importer (import coûteux)
+    if format == 'parquet' and importlib.util.find_spec('pyarrow') is None:
+        raise ImportError("Le format parquet nécessite pyarrow (pip install pyarrow)")
+    return format
+
+
+class EcrivainResultats:
+    """
+    Écrit partitions, métriques par communauté et statistiques du graphe.
+
+    Les lignes sont accumulées par type et écrites par lots d'au plus
+    taille_lot lignes, pour ne jamais garder tout le résultat en mémoire.
+
+    Formats (déduits de l'extension si format est None):
+        'jsonl':   un seul fichier, une ligne JSON par enregistrement avec un champ 'type'
+        'parquet': un fichier par type (<base>.partition.parquet, ...), nécessite pyarrow
+        'binaire': un seul fichier compact (voir lire_binaire)
+    """
+
+    def __init__(self, chemin, format=None, taille_lot=10000):
+        format = verifier_format(chemin, format)
+
+        self.chemin = chemin
+        self.format = format
+        self.taille_lot = taille_lot
+        self._tampons = {'partition': [], 'communautes': [], 'graphe': []}
+        self._fichier = None
+        self._writers_parquet = {}
+
+        if format == 'binaire':
+            self._fichier = open(chemin, 'wb')
+            self._fichier.write(ENTETE_BINAIRE)
+        else:
+            self._fichier = open(chemin, 'w', encoding='utf-8')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fermer()
+
+    def ecrire_partition(self, partition):
+        """
+        Ajoute les lignes (utilisateur, communauté) d'une partition.
+
+        Arguments:
+            partition: dictionnaire {utilisateur: numéro_communauté}
+        """
+        for utilisateur, num_comm in partition.items():
+            self._ajouter('partition', {'utilisateur': _en_python(utilisateur), 'communaute': int(num_comm)})
+
+    def ecrire_communautes(self, analyses):
+        """
+        Ajoute les métriques de chaque communauté (sans la liste des membres).
+
+        Le champ 'communaute' est le même identifiant que dans les lignes de
+        partition; le numéro d'affichage (à partir de 1) n'est pas écrit.
+
+        Arguments:
+            analyses: liste de dictionnaires (voir analyse.analyser_toutes_communautes)
+        """
+        for a in analyses:
+            ligne = {cle: _en_python(valeur) for cle, valeur in a.items() if cle not in ('membres', 'numero')}
+            self._ajouter('communautes', ligne)
+
+    def ecrire_statistiques(self, stats):
+        """
+        Ajoute un enregistrement de statistiques globales du graphe.
+        """
+        self._ajouter('graphe', {cle: _en_python(valeur) for cle, valeur in stats.items()})
+
+    def _ajouter(self, type_ligne, ligne):
+        tampon = self._tampons[type_ligne]
+        tampon.append(ligne)
+        if len(tampon) >= self.taille_lot:
+            self._vider(type_ligne)
+
+    def _vider(self, type_ligne):
+        """
+        Écrit le lot en attente d'un type de lignes.
+        """
+        lignes = self._tampons[type_ligne]
+        if not lignes:
+            return
+        self._tampons[type_ligne] = []
+
+        if self.format == 'jsonl':
+            for ligne in lignes:
+                self._fichier.write(json.dumps({'type': type_ligne, **ligne}, ensure_ascii=False,
+                                               allow_nan=False) + "\n")
+
+        elif self.format == 'parquet':
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            writer = self._writers_parquet.get(type_ligne)
+            if writer is None:
+                table = pa.Table.from_pylist(lignes)
+                base = os.path.splitext(self.chemin)[0]
+                writer = pq.ParquetWriter(f"{base}.{type_ligne}.parquet", table.schema)
+                self._writers_parquet[type_ligne] = writer
+            else:
+                table = pa.Table.from_pylist(lignes, schema=writer.schema)
+            writer.write_table(table)
+
+        else:
+            self._fichier.write(TYPES_BLOCS[type_ligne])
+            if type_ligne == 'partition':
+                contenu = _encoder_partition(lignes)
+            else:
+                contenu = json.dumps(lignes, ensure_ascii=False, allow_nan=False).encode('utf-8')
+            self._fichier.write(struct.pack('<I', len(contenu)))
+            self._fichier.write(contenu)
+
+    def fermer(self):
+        """
+        Écrit les lots restants et ferme les fichiers.
+        """
+        for type_ligne in self._tampons:
+            self._vider(type_ligne)
+        for writer in self._writers_parquet.values():
+            writer.close()
+        self._writers_parquet = {}
+        if self._fichier is not None:
+            self._fichier.close()
+            self._fichier = None
+
+
+def _encoder_partition(lignes):
+    """
+    Encode un lot de partition: nombre de lignes, communautés (int32),
+    fins des noms (uint32), puis les noms en UTF-8 mis bout à bout.
+    """
+    noms = [str(ligne['utilisateur']).encode('utf-8') for ligne in lignes]
+    fins = []
+    total = 0
+    for nom in noms:
+        total += len(nom)
+        fins.append(total)
+
+    n = len(lignes)
+    return b''.join([
+        struct.pack('<I', n),
+        struct.pack(f'<{n}i', *(ligne['communaute'] for ligne in lignes)),
+        struct.pack(f'<{n}I', *fins),
+        b''.join(noms)
+    ])
+
+
+def _decoder_partition(contenu):
+    """
+    Décode un lot encodé par _encoder_partition.
+    """
+    n = struct.unpack_from('<I', contenu, 0)[0]
+    communautes = struct.unpack_from(f'<{n}i', contenu, 4)
+    fins = struct.unpack_from(f'<{n}I', contenu, 4 + 4 * n)
+    noms = contenu[4 + 8 * n:]
+
+    lignes = []
+    debut = 0
+    for num_comm, fin in zip(communautes, fins):
+        lignes.append({'utilisateur': noms[debut:fin].decode('utf-8'), 'communaute': num_comm})
+        debut = fin
+    return lignes
+
+
+def lire_binaire(chemin):
+    """
+    Relit un fichier écrit au format binaire, lot par lot.
+
+    Retourne un générateur de (type, liste de lignes)
+    """
+    types = {code: nom for nom, code in TYPES_BLOCS.items()}
+
+    with open(chemin, 'rb') as f:
+        if f.read(len(ENTETE_BINAIRE)) != ENTETE_BINAIRE:
+            raise ValueError(f"Fichier binaire invalide: {chemin}")
+
+        while True:
+            code = f.read(1)
+            if not code:
+                return
+            taille = struct.unpack('<I', f.read(4))[0]
+            contenu = f.read(taille)
+
+            if types[code] == 'partition':
+                yield 'partition', _decoder_partition(contenu)
+            else:
+                yield types[code], json.loads(contenu.decode('utf-8'))
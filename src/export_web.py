@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+Module d'export du graphe pour l'interface web.
+Écrit un paquet JSON à plusieurs niveaux de détail, chargé progressivement par app.js.
+
+Contenu du dossier exporté:
+    index.json              vue d'ensemble: supergraphe des communautés, positions,
+                            liste des tuiles et des partitions (seul fichier chargé au départ)
+    noeuds.json             noms des utilisateurs (l'indice sert d'identifiant)
+    tuiles/communaute_N.json    membres de la communauté N, leurs positions, leurs arêtes
+                            internes et leurs liens vers les autres communautés
+    partitions/ALGO.json    communauté de chaque utilisateur pour l'algorithme ALGO
+"""
+
+import json
+import os
+
+import numpy as np
+
+from src.graphe import charger_graphe_complet, construire_csr
+
+
+# Étendue des coordonnées de la vue d'ensemble (en pixels vis-network)
+ECHELLE = 1000
+
+# Au-delà de cette taille, une communauté est disposée en cercle (spring_layout trop lent)
+TAILLE_MAX_DISPOSITION = 2000
+
+
+def construire_supergraphe(indptr, indices, poids, labels):
+    """
+    Construit le graphe des communautés (une arête pondérée par couple de communautés).
+
+    Retourne: (tailles, poids_internes, sources, cibles, poids_aretes)
+    """
+    nb_communautes = int(labels.max()) + 1 if len(labels) else 0
+    tailles = np.bincount(labels, minlength=nb_communautes)
+
+    # Chaque arête (u, v) vue une fois, avec u <= v
+    lignes = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+    une_fois = lignes <= indices
+    cu, cv, w = labels[lignes[une_fois]], labels[indices[une_fois]], poids[une_fois]
+
+    # Poids interne de chaque communauté
+    internes = cu == cv
+    poids_internes = np.bincount(cu[internes], weights=w[internes], minlength=nb_communautes)
+
+    # Arêtes entre communautés, regroupées par couple (min, max)
+    a = np.minimum(cu[~internes], cv[~internes])
+    b = np.maximum(cu[~internes], cv[~internes])
+    cles, inverse = np.unique(a * nb_communautes + b, return_inverse=True)
+    poids_aretes = np.bincount(inverse, weights=w[~internes], minlength=len(cles))
+
+    return tailles, poids_internes, cles // nb_communautes, cles % nb_communautes, poids_aretes
+
+
+def disposer(G, echelle, centre=(0.0, 0.0), poids='weight'):
+    """
+    Calcule les positions des noeuds de G, centrées et mises à l'échelle.
+
+    Retourne un dictionnaire {noeud: (x, y)}
+    """
+    import networkx as nx
+
+    if G.number_of_nodes() == 1:
+        positions = {n: np.zeros(2) for n in G.nodes()}
+    elif G.number_of_nodes() > TAILLE_MAX_DISPOSITION:
+        positions = nx.circular_layout(G)
+    else:
+        positions = nx.spring_layout(G, seed=42, weight=poids)
+
+    return {n: (float(centre[0] + p[0] * echelle), float(centre[1] + p[1] * echelle))
+            for n, p in positions.items()}
+
+
+def ecrire_json(chemin, donnees):
+    """
+    Écrit un fichier JSON compact.
+    """
+    with open(chemin, 'w', encoding='utf-8') as f:
+        json.dump(donnees, f, ensure_ascii=False, separators=(',', ':'))
+
+
+def exporter_bundle(G, partitions, dossier, principal=None, modularites=None):
+    """
+    Exporte le graphe et ses partitions pour l'interface web.
+
+    Arguments:
+        G: le graphe
+        partitions: dictionnaire {nom_algorithme: {utilisateur: communauté}}
+        dossier: dossier de sortie (créé si besoin)
+        principal: algorithme utilisé pour le supergraphe et les tuiles
+            (par défaut, le premier de partitions)
+        modularites: dictionnaire optionnel {nom_algorithme: modularité}
+
+    Retourne le contenu de index.json
+    """
+    import networkx as nx
+
+    principal = principal or next(iter(partitions))
+    modularites = modularites or {}
+    os.makedirs(os.path.join(dossier, "tuiles"), exist_ok=True)
+    os.makedirs(os.path.join(dossier, "partitions"), exist_ok=True)
+
+    noeuds, indptr, indices, poids = construire_csr(G)
+    ecrire_json(os.path.join(dossier, "noeuds.json"), [str(n) for n in noeuds])
+
+    # === Partitions (alignées sur noeuds.json) ===
+    infos_partitions = {}
+    for algorithme, partition in partitions.items():
+        labels = [int(partition[n]) for n in noeuds]
+        fichier = f"partitions/{algorithme}.json"
+        ecrire_json(os.path.join(dossier, fichier), labels)
+        infos_partitions[algorithme] = {
+            'fichier': fichier,
+            'nb_communautes': len(set(labels)),
+            'modularite': modularites.get(algorithme)
+        }
+
+    # === Supergraphe et sa disposition ===
+    bruts = np.array([partitions[principal][n] for n in noeuds])
+    _, labels = np.unique(bruts, return_inverse=True)
+    tailles, poids_internes, sources, cibles, poids_aretes = construire_supergraphe(indptr, indices, poids, labels)
+
+    S = nx.Graph()
+    S.add_nodes_from(range(len(tailles)))
+    S.add_weighted_edges_from(zip(sources.tolist(), cibles.tolist(), poids_aretes.tolist()))
+    centres = disposer(S, ECHELLE)
+
+    # Rayon d'une communauté proportionnel à la racine de sa taille
+    rayons = ECHELLE * 0.25 * np.sqrt(tailles / max(tailles.max(), 1))
+
+    # === Tuiles: une par communauté, avec positions détaillées ===
+    ordre = np.argsort(labels, kind='stable')
+    coupures = np.cumsum(tailles)[:-1]
+
+    # Position de chaque noeud dans sa tuile
+    debuts_tuiles = np.concatenate([[0], coupures])
+    locaux = np.empty(len(noeuds), dtype=np.int64)
+    locaux[ordre] = np.arange(len(noeuds)) - np.repeat(debuts_tuiles, tailles)
+
+    # Arêtes internes (vues une fois), regroupées par communauté
+    lignes = np.repeat(np.arange(len(noeuds)), np.diff(indptr))
+    internes = (labels[lignes] == labels[indices]) & (lignes <= indices)
+    u, v, w = lignes[internes], indices[internes], poids[internes]
+    ordre_aretes = np.argsort(labels[u], kind='stable')
+    coupures_aretes = np.cumsum(np.bincount(labels[u], minlength=len(tailles)))[:-1]
+    aretes_par_tuile = np.split(ordre_aretes, coupures_aretes)
+
+    # Liens vers les autres communautés, vus depuis chaque membre
+    externes = labels[lignes] != labels[indices]
+    xu, xv, xw = lignes[externes], indices[externes], poids[externes]
+    ordre_externes = np.argsort(labels[xu], kind='stable')
+    coupures_externes = np.cumsum(np.bincount(labels[xu], minlength=len(tailles)))[:-1]
+    externes_par_tuile = np.split(ordre_externes, coupures_externes)
+
+    tuiles = []
+    for c, membres in enumerate(np.split(ordre, coupures)):
+        sous_graphe = G.subgraph([noeuds[m] for m in membres])
+        positions = disposer(sous_graphe, float(rayons[c]), centres[c])
+
+        # Arêtes internes, en indices locaux: [source, cible, poids]
+        a = aretes_par_tuile[c]
+        aretes = [list(arete) for arete in zip(locaux[u[a]].tolist(), locaux[v[a]].tolist(), w[a].tolist())]
+
+        # Liens externes: [source locale, noeud cible, communauté cible, poids]
+        x = externes_par_tuile[c]
+        liens_externes = [list(lien) for lien in zip(locaux[xu[x]].tolist(), xv[x].tolist(),
+                                                      labels[xv[x]].tolist(), xw[x].tolist())]
+
+        fichier = f"tuiles/communaute_{c}.json"
+        ecrire_json(os.path.join(dossier, fichier), {
+            'communaute': c,
+            'noeuds': [{'id': int(m), 'nom': str(noeuds[m]),
+                        'x': round(positions[noeuds[m]][0], 1), 'y': round(positions[noeuds[m]][1], 1)}
+                       for m in membres],
+            'aretes': aretes,
+            'externes': liens_externes
+        })
+        tuiles.append({'communaute': c, 'fichier': fichier, 'taille': int(tailles[c])})
+
+    # === Index: le seul fichier chargé au démarrage ===
+    index = {
+        'version': 2,
+        'nb_noeuds': len(noeuds),
+        'nb_aretes': G.number_of_edges(),
+        'principal': principal,
+        'partitions': infos_partitions,
+        'supergraphe': {
+            'noeuds': [{'id': c, 'taille': int(tailles[c]), 'poids_interne': float(poids_internes[c]),
+                        'x': round(centres[c][0], 1), 'y': round(centres[c][1], 1)}
+                       for c in range(len(tailles))],
+            'aretes': [{'source': source, 'cible': cible, 'poids': p}
+                       for source, cible, p in zip(sources.tolist(), cibles.tolist(), poids_aretes.tolist())]
+        },
+        'tuiles': tuiles
+    }
+    ecrire_json(os.path.join(dossier, "index.json"), index)
+
+    print(f"  ✓ Paquet web exporté: {dossier} ({len(tuiles)} tuiles, {len(partitions)} partition(s))")
+    return index
+
+
+# === Test du module ===
+if __name__ == "__main__":
+    from src.louvain import executer_louvain
+    from src.girvan_newman import executer_girvan_newman
+
+    # Chemin vers les données
+    chemin = os.path.join(os.path.dirname(__file__), "..", "data", "reseau_amis.csv")
+
+    # Charger le graphe
+    print("Chargement du graphe...")
+    G = charger_graphe_complet(chemin)
+
+    # Détecter les communautés
+    partition_l, mod_l, comm_l = executer_louvain(G, silencieux=True)
+    partition_gn, mod_gn, comm_gn = executer_girvan_newman(G, k=5, silencieux=True)
+
+    # Exporter
+    dossier = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", "inetrface", "bundle"))
+    exporter_bundle(G, {'louvain': partition_l, 'girvan_newman': partition_gn}, dossier,
+                    modularites={'louvain': mod_l, 'girvan_newman': mod_gn})
@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+"""
+Module de détection de communautés par fenêtres de temps glissantes.
+Suit l'évolution des communautés semaine par semaine (ou mois par mois).
+"""
+
+import community  # python-louvain
+import networkx as nx
+import numpy as np
+
+from src.graphe import charger_donnees, convertir_dates, retirer_relations_incompletes, POLITIQUES_BOUCLES
+from src.louvain import calculer_modularite
+
+
+def aligner_labels(partition, precedente, prochain_label):
+    """
+    Renumérote les communautés pour suivre leur identité d'une fenêtre à l'autre.
+
+    Chaque nouvelle communauté reprend le label de la communauté précédente
+    avec laquelle elle partage le plus de membres (sans doublon); les autres
+    reçoivent un nouveau label.
+
+    Arguments:
+        partition: {utilisateur: communauté} de la fenêtre courante
+        precedente: {utilisateur: label} de la fenêtre précédente
+        prochain_label: premier label jamais utilisé
+
+    Retourne: (partition renumérotée, prochain_label)
+    """
+    # Nombre de membres communs pour chaque couple (nouvelle, ancienne)
+    communs = {}
+    for utilisateur, num_comm in partition.items():
+        if utilisateur in precedente:
+            couple = (num_comm, precedente[utilisateur])
+            communs[couple] = communs.get(couple, 0) + 1
+
+    # Les plus forts recouvrements d'abord
+    correspondance = {}
+    anciens_pris = set()
+    for (nouvelle, ancienne), nb in sorted(communs.items(), key=lambda x: -x[1]):
+        if nouvelle not in correspondance and ancienne not in anciens_pris:
+            correspondance[nouvelle] = ancienne
+            anciens_pris.add(ancienne)
+
+    for num_comm in sorted(set(partition.values())):
+        if num_comm not in correspondance:
+            correspondance[num_comm] = prochain_label
+            prochain_label += 1
+
+    return {u: correspondance[c] for u, c in partition.items()}, prochain_label
+
+
+def detecter_par_fenetres(df, colonne_temps, taille='7D', pas=None, graine=42, silencieux=False,
+                          politique_boucles='supprimer'):
+    """
+    Détecte les communautés sur une fenêtre de temps qui glisse sur les relations.
+
+    Les relations sont triées par date. À chaque pas, on ajoute au graphe
+    celles qui entrent dans la fenêtre et on retire celles qui en sortent
+    (le poids d'une arête compte ses relations présentes). Louvain repart
+    de la partition de la fenêtre précédente au lieu de tout recalculer.
+
+    Arguments:
+        df: DataFrame avec utilisateur1, utilisateur2 et la colonne de dates
+        colonne_temps: nom de la colonne de dates
+        taille: durée d'une fenêtre (ex: '7D', '30D')
+        pas: décalage entre deux fenêtres (par défaut égal à taille)
+        graine: graine aléatoire de Louvain
+        silencieux: si True, n'affiche rien
+        politique_boucles: 'supprimer' ou 'conserver' les relations d'un
+            utilisateur avec lui-même (comme construire_graphe)
+
+    Retourne une série compacte (dictionnaire de tableaux numpy):
+        'noms': utilisateurs (l'indice sert d'identifiant)
+        'debuts', 'fins': bornes de chaque fenêtre (datetime64)
+        'modularites', 'nb_communautes': une valeur par fenêtre
+        'decalages': la fenêtre i occupe noeuds[decalages[i]:decalages[i+1]]
+        'noeuds', 'labels': identifiant et communauté des utilisateurs présents
+    """
+    import pandas as pd
+
+    if politique_boucles not in POLITIQUES_BOUCLES:
+        raise ValueError(f"Politique de boucles inconnue: {politique_boucles!r} "
+                         f"(valeurs possibles: {', '.join(POLITIQUES_BOUCLES)})")
+
+    taille = pd.Timedelta(taille)
+    pas = taille if pas is None else pd.Timedelta(pas)
+
+    # Dates comparables aux bornes des fenêtres (UTC sans fuseau)
+    df = df.assign(**{colonne_temps: convertir_dates(df[colonne_temps])})
+
+    # Une date manquante (NaT) serait triée à la fin et fausserait la fin des données
+    manquantes = df[colonne_temps].isna()
+    if manquantes.any():
+        if not silencieux:
+            print(f"  ⚠ {int(manquantes.sum())} relation(s) sans date ignorée(s)")
+        df = df[~manquantes]
+
+    df = retirer_relations_incompletes(df, silencieux)
+
+    # Numéroter les utilisateurs, trier les relations par date
+    ordre = np.argsort(df[colonne_temps].to_numpy(), kind='stable')
+    paires = np.column_stack([df['utilisateur1'].to_numpy(), df['utilisateur2'].to_numpy()])[ordre]
+    codes, noms = pd.factorize(paires.ravel())
+    codes = codes.reshape(-1, 2)
+    temps = df[colonne_temps].to_numpy()[ordre]
+
+    # Boucles: ignorées ou gardées, comme dans construire_graphe
+    if politique_boucles == 'supprimer':
+        garder = codes[:, 0] != codes[:, 1]
+        codes, temps = codes[garder], temps[garder]
+
+    debuts, fins, modularites, nb_communautes = [], [], [], []
+    decalages, noeuds_serie, labels_serie = [0], [], []
+
+    G = nx.Graph()
+    entree = 0   # prochaine relation à ajouter
+    sortie = 0   # prochaine relation à retirer
+    precedente = {}
+    prochain_label = 0
+
+    debut = pd.Timestamp(temps[0]) if len(temps) else None
+    fin_donnees = pd.Timestamp(temps[-1]) if len(temps) else None
+
+    while debut is not None and debut <= fin_donnees:
+        fin = debut + taille
+
+        # Ajouter les relations qui entrent dans [debut, fin)
+        limite_fin = np.datetime64(fin)
+        while entree < len(temps) and temps[entree] < limite_fin:
+            u, v = codes[entree]
+            if G.has_edge(u, v):
+                G[u][v]['weight'] += 1
+            else:
+                G.add_edge(u, v, weight=1)
+            entree += 1
+
+        # Retirer les relations sorties de la fenêtre
+        limite_debut = np.datetime64(debut)
+        while sortie < entree and temps[sortie] < limite_debut:
+            u, v = codes[sortie]
+            G[u][v]['weight'] -= 1
+            if G[u][v]['weight'] == 0:
+                G.remove_edge(u, v)
+                for noeud in {u, v}:
+                    if G.degree(noeud) == 0:
+                        G.remove_node(noeud)
+            sortie += 1
+
+        # Détection, en repartant de la fenêtre précédente
+        if G.number_of_edges() > 0:
+            depart = {}
+            prochain_depart = prochain_label
+            for noeud in G.nodes():
+                if noeud in precedente:
+                    depart[noeud] = precedente[noeud]
+                else:
+                    depart[noeud] = prochain_depart
+                    prochain_depart += 1
+
+            partition = community.best_partition(G, partition=depart, random_state=graine)
+            modularite = calculer_modularite(G, partition)
+            partition, prochain_label = aligner_labels(partition, precedente, prochain_label)
+        else:
+            partition, modularite = {}, float('nan')
+
+        # Enregistrer la fenêtre sous forme compacte
+        presents = np.fromiter(partition.keys(), dtype=np.int32, count=len(partition))
+        ordre_presents = np.argsort(presents)
+        noeuds_serie.append(presents[ordre_presents])
+        labels_serie.append(np.fromiter(partition.values(), dtype=np.int32, count=len(partition))[ordre_presents])
+        decalages.append(decalages[-1] + len(partition))
+        debuts.append(debut)
+        fins.append(fin)
+        modularites.append(modularite)
+        nb_communautes.append(len(set(partition.values())))
+
+        if not silencieux:
+            print(f"  {debut.date()} → {fin.date()}: {G.number_of_nodes()} nœuds, "
+                  f"{G.number_of_edges()} arêtes, {nb_communautes[-1]} communautés, "
+                  f"modularité {modularite:.4f}")
+
+        precedente = partition
+        debut = debut + pas
+
+    return {
+        'noms': np.asarray(noms, dtype=str),
+        'debuts': np.array(debuts, dtype='datetime64[ns]'),
+        'fins': np.array(fins, dtype='datetime64[ns]'),
+        'modularites': np.array(modularites, dtype=np.float64),
+        'nb_communautes': np.array(nb_communautes, dtype=np.int32),
+        'decalages': np.array(decalages, dtype=np.int64),
+        'noeuds': np.concatenate(noeuds_serie) if noeuds_serie else np.empty(0, dtype=np.int32),
+        'labels': np.concatenate(labels_serie) if labels_serie else np.empty(0, dtype=np.int32),
+    }
+
+
+def partition_fenetre(serie, i):
+    """
+    Retourne la partition de la fenêtre i: {utilisateur: communauté}
+    """
+    debut, fin = serie['decalages'][i], serie['decalages'][i + 1]
+    noms = serie['noms'][serie['noeuds'][debut:fin]]
+    return dict(zip(noms.tolist(), serie['labels'][debut:fin].tolist()))
+
+
+def sauvegarder_serie(serie, chemin, silencieux=False):
+    """
+    Sauvegarde la série de partitions dans un fichier .npz compressé.
+    """
+    np.savez_compressed(chemin, **serie)
+    if not silencieux:
+        print(f"  ✓ Série sauvegardée: {chemin}")
+
+
+def charger_serie(chemin):
+    """
+    Charge une série sauvegardée par sauvegarder_serie.
+    """
+    with np.load(chemin) as donnees:
+        return {cle: donnees[cle] for cle in donnees.files}
+
+
+def executer_fenetres(chemin_csv, colonne_temps='date', taille='7D', pas=None, silencieux=False,
+                      politique_boucles='supprimer'):
+    """
+    Fonction principale: charge le CSV daté et détecte les communautés par fenêtre.
+    """
+    df = charger_donnees(chemin_csv, colonne_temps, silencieux)
+
+    if not silencieux:
+        print("\n" + "="*50)
+        print(f"   COMMUNAUTÉS PAR FENÊTRE ({taille})")
+        print("="*50)
+
+    serie = detecter_par_fenetres(df, colonne_temps, taille, pas, silencieux=silencieux,
+                                  politique_boucles=politique_boucles)
+
+    if not silencieux:
+        print("="*50)
+        print(f"\n  Nombre de fenêtres: {len(serie['debuts'])}")
+
+    return serie
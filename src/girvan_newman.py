@@ -6,12 +6,17 @@ Approche top-down (divisive) basée sur la centralité d'intermédiarité.
 
 import networkx as nx
 from networkx.algorithms.community import girvan_newman
+import hashlib
 import os
+import pickle
 import sys
+import time
 
 # Ajouter le chemin parent pour importer graphe
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from src.graphe import charger_graphe_complet
+from src.graphe import charger_graphe_complet, construire_csr
+from src.modularite import NoyauModularite, labels_depuis_communautes
+from src.ecriture import afficher_resume_communautes, TOP_K
 
 
 def detecter_communautes(G, k=None):
@@ -33,7 +38,9 @@ def detecter_communautes(G, k=None):
             if len(communautes) >= k:
                 return [set(c) for c in communautes]
     
-    # Sinon, on cherche la meilleure modularité
+    # Sinon, on cherche la meilleure modularité (graphe CSR préparé une fois)
+    noeuds, indptr, indices, poids = construire_csr(G)
+    noyau = NoyauModularite(indptr, indices, poids)
     meilleure_modularite = -1
     meilleures_communautes = None
     
@@ -43,7 +50,7 @@ def detecter_communautes(G, k=None):
         communautes_list = [set(c) for c in communautes]
         
         # Calculer la modularité
-        mod = calculer_modularite(G, communautes_list)
+        mod = noyau.modularite(labels_depuis_communautes(noeuds, communautes_list))
         
         # Garder si meilleure
         if mod > meilleure_modularite:
@@ -57,17 +64,252 @@ def detecter_communautes(G, k=None):
     return meilleures_communautes
 
 
-def calculer_modularite(G, communautes):
+def detecter_communautes_anytime(G, k=None, temps_max=None, chemin_checkpoint=None,
+                                 intervalle_checkpoint=30.0):
     """
-    Calcule la modularité pour une liste de communautés.
+    Applique Girvan-Newman en mode "anytime": on peut l'arrêter à tout moment.
+
+    On retire une à une les arêtes de plus forte intermédiarité et on garde la
+    meilleure partition (au sens de la modularité) trouvée jusqu'ici. L'état
+    (arêtes restantes, composantes courantes et centralités) est sauvegardé
+    périodiquement, ce qui permet de reprendre un calcul interrompu au lieu de
+    recommencer. Le checkpoint est supprimé quand le calcul se termine
+    normalement: il n'est gardé qu'après un dépassement de temps_max ou un Ctrl-C.
+
+    Chaque exécution retire au moins une arête avant de vérifier temps_max,
+    pour qu'une suite de reprises avance toujours, même avec un temps_max
+    plus court qu'un calcul complet des centralités.
+
+    Arguments:
+        G: le graphe
+        k: nombre de communautés souhaité (si None, on prend la meilleure modularité)
+        temps_max: durée maximale en secondes (si None, pas de limite)
+        chemin_checkpoint: fichier de sauvegarde de l'état (si None, pas de sauvegarde)
+        intervalle_checkpoint: nombre de secondes entre deux sauvegardes
+
+    Retourne une liste de sets: [{membres_comm_0}, {membres_comm_1}, ...]
+    """
+    debut = time.monotonic()
+
+    # Reprendre depuis le checkpoint s'il existe, sinon partir du graphe complet
+    etat = None
+    if chemin_checkpoint is not None:
+        etat = charger_checkpoint(chemin_checkpoint, G, k)
+    if etat is None:
+        etat = initialiser_etat(G)
+
+    # Graphe de travail: tous les noeuds, seulement les arêtes restantes
+    H = nx.Graph()
+    H.add_nodes_from(G.nodes())
+    H.add_edges_from(etat['aretes_restantes'])
+
+    # Modularité: graphe CSR préparé une fois, labels mis à jour à chaque scission
+    noeuds, indptr, indices, poids = construire_csr(G)
+    noyau = NoyauModularite(indptr, indices, poids)
+    index = {nom: i for i, nom in enumerate(noeuds)}
+    labels = labels_depuis_communautes(noeuds, etat['composantes'])
+    prochain_label = len(etat['composantes'])
+
+    # Centralité d'intermédiarité de chaque arête (non normalisée pour
+    # pouvoir comparer des valeurs calculées sur des composantes différentes),
+    # reprise du checkpoint si elle y est
+    centralites = etat.get('centralites')
+    if centralites is None:
+        centralites = {}
+        mettre_a_jour_centralites(H, centralites, H.nodes())
+
+    dernier_checkpoint = time.monotonic()
+    retirees_au_depart = etat['nb_aretes_retirees']
+    interrompu = False
+    try:
+        while H.number_of_edges() > 0:
+            # Arrêter si on a assez de communautés
+            if k is not None and len(etat['composantes']) >= k:
+                break
+
+            # Arrêter si le temps est écoulé (après au moins une arête retirée)
+            if temps_max is not None and etat['nb_aretes_retirees'] > retirees_au_depart \
+                    and time.monotonic() - debut >= temps_max:
+                print(f"  ⚠ Temps écoulé ({temps_max}s): meilleure partition conservée")
+                interrompu = True
+                break
+
+            # Retirer l'arête la plus centrale
+            u, v = max(centralites, key=centralites.get)
+            H.remove_edge(u, v)
+            centralites.pop((u, v), None)
+            centralites.pop((v, u), None)
+            etat['nb_aretes_retirees'] += 1
+
+            # Vérifier si la composante de u s'est scindée en deux
+            composante_u = nx.node_connected_component(H, u)
+            noeuds_touches = set(composante_u)
+            if v not in composante_u:
+                composante_v = nx.node_connected_component(H, v)
+                noeuds_touches |= composante_v
+                etat['composantes'] = [c for c in etat['composantes'] if u not in c]
+                etat['composantes'] += [composante_u, composante_v]
+                labels[[index[nom] for nom in composante_v]] = prochain_label
+                prochain_label += 1
+
+                # Garder si meilleure
+                mod = noyau.modularite(labels)
+                if mod > etat['meilleure_modularite']:
+                    etat['meilleure_modularite'] = mod
+                    etat['meilleures_communautes'] = [set(c) for c in etat['composantes']]
+
+            # Seules les composantes touchées changent de centralité
+            mettre_a_jour_centralites(H, centralites, noeuds_touches)
+
+            # Sauvegarde périodique
+            if chemin_checkpoint is not None and time.monotonic() - dernier_checkpoint >= intervalle_checkpoint:
+                etat['aretes_restantes'] = list(H.edges())
+                etat['centralites'] = centralites
+                sauvegarder_checkpoint(chemin_checkpoint, etat)
+                dernier_checkpoint = time.monotonic()
+    except KeyboardInterrupt:
+        print("  ⚠ Interruption: meilleure partition conservée")
+        interrompu = True
+
+        # L'interruption a pu tomber entre le retrait d'une arête et la mise
+        # à jour des composantes: on les recalcule depuis le graphe de travail.
+        # Les centralités peuvent être incomplètes: la reprise les recalculera
+        etat['composantes'] = [set(c) for c in nx.connected_components(H)]
+        centralites = None
+
+    # Le checkpoint ne sert qu'à reprendre un calcul inachevé
+    if chemin_checkpoint is not None:
+        if interrompu:
+            etat['aretes_restantes'] = list(H.edges())
+            etat['centralites'] = centralites
+            sauvegarder_checkpoint(chemin_checkpoint, etat)
+        elif os.path.exists(chemin_checkpoint):
+            os.remove(chemin_checkpoint)
+
+    # Si k est atteint, on retourne la partition courante (comme detecter_communautes)
+    if k is not None and len(etat['composantes']) >= k:
+        return [set(c) for c in etat['composantes']]
+
+    return etat['meilleures_communautes']
+
+
+def initialiser_etat(G):
+    """
+    Crée l'état de départ du mode anytime: aucune arête retirée.
+    """
+    composantes = [set(c) for c in nx.connected_components(G)]
+    return {
+        'signature': signature_graphe(G),
+        'aretes_restantes': list(G.edges()),
+        'composantes': composantes,
+        'centralites': None,
+        'meilleure_modularite': calculer_modularite(G, composantes),
+        'meilleures_communautes': [set(c) for c in composantes],
+        'nb_aretes_retirees': 0
+    }
+
+
+def signature_graphe(G):
+    """
+    Retourne une empreinte du graphe (noeuds, arêtes et poids).
+
+    Elle ne dépend pas de l'ordre des noeuds et des arêtes: deux graphes
+    ont la même empreinte seulement s'ils ont exactement les mêmes arêtes.
+    """
+    noeuds = sorted(repr(nom) for nom in G.nodes())
+    aretes = sorted(
+        (*sorted((repr(u), repr(v))), repr(attributs.get('weight', 1)))
+        for u, v, attributs in G.edges(data=True)
+    )
+
+    empreinte = hashlib.sha256()
+    for nom in noeuds:
+        empreinte.update(f"{nom}\n".encode('utf-8'))
+    for u, v, poids in aretes:
+        empreinte.update(f"{u}\t{v}\t{poids}\n".encode('utf-8'))
+    return empreinte.hexdigest()
+
+
+def mettre_a_jour_centralites(H, centralites, noeuds):
+    """
+    Recalcule la centralité des arêtes du sous-graphe induit par noeuds.
+
+    Arguments:
+        H: le graphe de travail
+        centralites: dictionnaire {(u, v): centralité} mis à jour sur place
+        noeuds: noeuds des composantes dont les arêtes doivent être recalculées
+    """
+    # Oublier les anciennes valeurs de ces arêtes
+    for u, v in H.edges(noeuds):
+        centralites.pop((u, v), None)
+        centralites.pop((v, u), None)
+
+    # Copie: edge_betweenness_centrality est bien plus lent sur une vue filtrée
+    sous_graphe = H.subgraph(noeuds).copy()
+    if sous_graphe.number_of_edges() > 0:
+        centralites.update(nx.edge_betweenness_centrality(sous_graphe, normalized=False))
+
+
+def sauvegarder_checkpoint(chemin, etat):
+    """
+    Sauvegarde l'état du mode anytime sur le disque.
+
+    L'écriture passe par un fichier temporaire pour qu'un arrêt brutal
+    ne laisse jamais un checkpoint à moitié écrit.
+    """
+    chemin_tmp = chemin + ".tmp"
+    with open(chemin_tmp, 'wb') as f:
+        pickle.dump(etat, f)
+    os.replace(chemin_tmp, chemin)
+
+
+def charger_checkpoint(chemin, G, k=None):
+    """
+    Charge un état sauvegardé par sauvegarder_checkpoint.
+
+    Les composantes sont recalculées à partir des arêtes restantes, qui
+    font foi si l'état a été sauvegardé au milieu d'une scission.
+
+    Retourne None si le fichier n'existe pas, ne correspond pas au graphe G,
+    ou a déjà dépassé k communautés.
+    """
+    if not os.path.exists(chemin):
+        return None
+
+    with open(chemin, 'rb') as f:
+        etat = pickle.load(f)
+
+    if etat.get('signature') != signature_graphe(G):
+        print(f"  ⚠ Checkpoint ignoré (graphe différent): {chemin}")
+        return None
+
+    H = nx.Graph()
+    H.add_nodes_from(G.nodes())
+    H.add_edges_from(etat['aretes_restantes'])
+    etat['composantes'] = [set(c) for c in nx.connected_components(H)]
+
+    if k is not None and len(etat['composantes']) > k:
+        print(f"  ⚠ Checkpoint ignoré (déjà {len(etat['composantes'])} communautés, k = {k}): {chemin}")
+        return None
+
+    print(f"  ✓ Reprise depuis le checkpoint: {etat['nb_aretes_retirees']} arête(s) déjà retirée(s)")
+    return etat
+
+
+def calculer_modularite(G, communautes, resolution=1.0):
+    """
+    Calcule la modularité pour une liste de communautés (voir src/modularite.py).
     
     Arguments:
         G: le graphe
         communautes: liste de sets [{membres_1}, {membres_2}, ...]
+        resolution: paramètre de résolution (1 = modularité classique)
     
     Retourne la modularité (entre -1 et 1)
     """
-    modularite = nx.community.modularity(G, communautes)
+    noeuds, indptr, indices, poids = construire_csr(G)
+    labels = labels_depuis_communautes(noeuds, communautes)
+    modularite = NoyauModularite(indptr, indices, poids, resolution).modularite(labels)
     return modularite
 
 
@@ -84,35 +326,33 @@ def convertir_en_partition(communautes):
     return partition
 
 
-def afficher_communautes(communautes):
+def afficher_communautes(communautes, top_k=TOP_K):
     """
-    Affiche les communautés de manière lisible.
+    Affiche un résumé des communautés (seulement les top_k plus grandes).
     """
-    print("\n" + "="*50)
-    print("   COMMUNAUTÉS DÉTECTÉES (GIRVAN-NEWMAN)")
-    print("="*50)
-    print(f"\n  Nombre de communautés: {len(communautes)}\n")
-    
-    for i, membres in enumerate(communautes):
-        print(f"  Communauté {i+1}: {sorted(membres)}")
-    
-    print("="*50)
-    
+    afficher_resume_communautes(communautes, "COMMUNAUTÉS DÉTECTÉES (GIRVAN-NEWMAN)", top_k)
     return communautes
 
 
-def executer_girvan_newman(G, k=None):
+def executer_girvan_newman(G, k=None, temps_max=None, chemin_checkpoint=None, silencieux=False, top_k=TOP_K):
     """
     Fonction principale qui exécute tout le processus Girvan-Newman.
     
     Arguments:
         G: le graphe
         k: nombre de communautés souhaité (optionnel)
+        temps_max: durée maximale en secondes (optionnel, active le mode anytime)
+        chemin_checkpoint: fichier de reprise (optionnel, active le mode anytime)
+        silencieux: si True, n'affiche rien
+        top_k: nombre de communautés montrées dans le résumé
     
     Retourne: (partition, modularité, communautés)
     """
     # Détecter les communautés
-    communautes = detecter_communautes(G, k)
+    if temps_max is not None or chemin_checkpoint is not None:
+        communautes = detecter_communautes_anytime(G, k, temps_max, chemin_checkpoint)
+    else:
+        communautes = detecter_communautes(G, k)
     
     # Calculer la modularité
     modularite = calculer_modularite(G, communautes)
@@ -121,8 +361,9 @@ def executer_girvan_newman(G, k=None):
     partition = convertir_en_partition(communautes)
     
     # Afficher les résultats
-    afficher_communautes(communautes)
-    print(f"\n  Modularité: {modularite:.4f}")
+    if not silencieux:
+        afficher_communautes(communautes, top_k)
+        print(f"\n  Modularité: {modularite:.4f}")
     
     return partition, modularite, communautes
 
@@ -1,86 +1,293 @@
 """
 Module de construction du graphe.
 Charge les données CSV et construit le réseau d'amis.
+
+pandas, networkx et les autres modules de src ne sont importés que par
+les fonctions qui en ont besoin: charger_aretes et
+construire_csr_depuis_aretes n'utilisent que numpy.
 """
 
-import pandas as pd
-import networkx as nx
+import csv
+import os
+import sys
+
+import numpy as np
+
 
+# Politiques possibles pour les relations d'un utilisateur avec lui-même
+POLITIQUES_BOUCLES = ('supprimer', 'conserver')
 
-def charger_donnees(chemin_csv):
+
+def charger_donnees(chemin_csv, colonne_temps=None, silencieux=False):
     """
     Charge les relations d'amitié depuis un fichier CSV.
+    
+    Arguments:
+        chemin_csv: fichier avec les colonnes utilisateur1, utilisateur2
+        colonne_temps: colonne optionnelle avec la date de création de la
+            relation (convertie en datetime UTC sans fuseau, voir convertir_dates)
+        silencieux: si True, n'affiche rien
     """
+    import pandas as pd
+    
     df = pd.read_csv(chemin_csv)
-    print(f"✓ Données chargées: {len(df)} relations trouvées")
+    if not silencieux:
+        print(f"✓ Données chargées: {len(df)} relations trouvées")
+    
+    if colonne_temps is not None:
+        df[colonne_temps] = convertir_dates(df[colonne_temps])
+        if not silencieux:
+            print(f"✓ Dates: du {df[colonne_temps].min()} au {df[colonne_temps].max()}")
+    
     return df
 
 
-def construire_graphe(df):
+def convertir_dates(dates):
+    """
+    Convertit une colonne de dates en datetime UTC sans fuseau.
+    
+    Les dates avec fuseau (ex: "2024-03-01T10:00:00Z") sont ramenées en UTC,
+    les dates sans fuseau sont considérées comme déjà en UTC: toutes les
+    dates sont ainsi comparables entre elles et avec des bornes sans fuseau.
+    """
+    import pandas as pd
+    
+    return pd.to_datetime(dates, utc=True).dt.tz_convert(None)
+
+
+def est_manquant(utilisateur):
+    """
+    Indique si une case utilisateur est vide (absente, NaN ou blanche).
+    """
+    if utilisateur is None:
+        return True
+    if isinstance(utilisateur, float):
+        return utilisateur != utilisateur   # NaN
+    return isinstance(utilisateur, str) and utilisateur.strip() == ''
+
+
+def retirer_relations_incompletes(df, silencieux=False):
+    """
+    Retire les relations dont un des deux utilisateurs manque.
+    
+    Sans cela, pd.factorize donnerait le code -1 à la case vide, qui
+    désignerait ensuite le dernier utilisateur (arête inventée).
+    
+    Retourne le DataFrame filtré
+    """
+    manquants = df['utilisateur1'].map(est_manquant) | df['utilisateur2'].map(est_manquant)
+    if manquants.any():
+        if not silencieux:
+            print(f"  ⚠ {int(manquants.sum())} relation(s) sans utilisateur ignorée(s)")
+        df = df[~manquants]
+    return df
+
+
+def agreger_aretes(sources, cibles, nb_noeuds, politique_boucles='supprimer'):
+    """
+    Fusionne les relations répétées en arêtes pondérées.
+    
+    Chaque paire est mise sous forme canonique (min, max), puis les doublons
+    (même sens ou sens inverse) sont regroupés par tri: le poids d'une arête
+    est le nombre de fois où la relation apparaît. Les arêtes gardent l'ordre
+    de leur première apparition.
+    
+    Arguments:
+        sources, cibles: tableaux d'indices des deux amis de chaque relation
+        nb_noeuds: nombre d'utilisateurs
+        politique_boucles: 'supprimer' (ignorer les boucles) ou 'conserver'
+            (les garder comme arêtes pondérées d'un noeud vers lui-même)
+    
+    Retourne: (petits, grands, poids, nb_boucles) avec nb_boucles le
+    nombre de relations d'un utilisateur avec lui-même
+    """
+    if politique_boucles not in POLITIQUES_BOUCLES:
+        raise ValueError(f"Politique de boucles inconnue: {politique_boucles!r} "
+                         f"(valeurs possibles: {', '.join(POLITIQUES_BOUCLES)})")
+    
+    # Forme canonique (min, max)
+    petits = np.minimum(sources, cibles).astype(np.int64)
+    grands = np.maximum(sources, cibles).astype(np.int64)
+    
+    # Boucles: comptées, puis supprimées si demandé
+    boucles = petits == grands
+    nb_boucles = int(boucles.sum())
+    if politique_boucles == 'supprimer':
+        petits, grands = petits[~boucles], grands[~boucles]
+    
+    # Regrouper les doublons (tri des clés), dans l'ordre de première apparition
+    cles, premieres, poids = np.unique(petits * nb_noeuds + grands, return_index=True, return_counts=True)
+    ordre = np.argsort(premieres, kind='stable')
+    cles, poids = cles[ordre], poids[ordre]
+    
+    return cles // nb_noeuds, cles % nb_noeuds, poids, nb_boucles
+
+
+def construire_graphe(df, politique_boucles='supprimer', silencieux=False):
     """
     Construit le graphe à partir des données.
+    
+    Les relations répétées deviennent une seule arête dont l'attribut
+    'weight' compte les répétitions (voir agreger_aretes).
     """
-    # Créer un graphe vide
-    G = nx.Graph()
+    import pandas as pd
+    import networkx as nx
+    
+    df = retirer_relations_incompletes(df, silencieux)
     
-    # Ajouter chaque relation comme une arête
-    for i in range(len(df)):
-        ami1 = df.loc[i, 'utilisateur1']
-        ami2 = df.loc[i, 'utilisateur2']
-        G.add_edge(ami1, ami2)
+    # Numéroter les utilisateurs dans l'ordre d'apparition (ligne par ligne)
+    paires = np.column_stack([df['utilisateur1'].to_numpy(), df['utilisateur2'].to_numpy()])
+    codes, noms = pd.factorize(paires.ravel())
+    codes = codes.reshape(-1, 2)
     
-    print(f"✓ Graphe construit: {G.number_of_nodes()} nœuds, {G.number_of_edges()} arêtes")
+    # Fusionner les doublons en poids
+    petits, grands, poids, nb_boucles = agreger_aretes(codes[:, 0], codes[:, 1], len(noms), politique_boucles)
+    
+    # Créer le graphe
+    G = nx.Graph()
+    G.add_nodes_from(noms)
+    G.add_weighted_edges_from(zip(noms[petits], noms[grands], poids.tolist()))
+    G.graph['nb_boucles'] = nb_boucles
+    
+    nb_doublons = len(df) - len(poids) - (nb_boucles if politique_boucles == 'supprimer' else 0)
+    action = 'supprimée(s)' if politique_boucles == 'supprimer' else 'conservée(s)'
+    if not silencieux:
+        print(f"✓ Graphe construit: {G.number_of_nodes()} nœuds, {G.number_of_edges()} arêtes "
+              f"({nb_doublons} doublon(s) fusionné(s), {nb_boucles} boucle(s) {action})")
     return G
 
 
-def afficher_informations_graphe(G):
+def construire_csr(G):
+    """
+    Convertit le graphe en tableaux CSR (Compressed Sparse Row).
+    
+    Les voisins du noeud i sont indices[indptr[i]:indptr[i+1]], avec les
+    poids correspondants dans poids (1 si l'arête n'a pas d'attribut 'weight').
+    
+    Retourne: (noeuds, indptr, indices, poids)
+    """
+    noeuds = list(G.nodes())
+    index = {nom: i for i, nom in enumerate(noeuds)}
+    
+    # Pointeurs de début de ligne: somme cumulée des degrés
+    degres = np.fromiter((len(G[nom]) for nom in noeuds), dtype=np.int64, count=len(noeuds))
+    indptr = np.zeros(len(noeuds) + 1, dtype=np.int64)
+    np.cumsum(degres, out=indptr[1:])
+    
+    # Voisins et poids, ligne par ligne
+    nb_entrees = int(indptr[-1])
+    indices = np.fromiter((index[v] for u in noeuds for v in G[u]), dtype=np.int64, count=nb_entrees)
+    poids = np.fromiter(
+        (attributs.get('weight', 1) for u in noeuds for attributs in G[u].values()),
+        dtype=np.float64, count=nb_entrees
+    )
+    
+    return noeuds, indptr, indices, poids
+
+
+def charger_aretes(chemin_csv, silencieux=False):
+    """
+    Charge les relations d'amitié sans pandas ni networkx.
+    
+    Chaque utilisateur reçoit un numéro dans l'ordre d'apparition. Les
+    relations dont un utilisateur manque sont ignorées, comme dans
+    construire_graphe.
+    
+    Retourne: (noeuds, sources, cibles) avec sources et cibles des tableaux d'indices
+    """
+    index = {}
+    paires = []
+    nb_incompletes = 0
+    
+    with open(chemin_csv, newline='', encoding='utf-8') as f:
+        lecteur = csv.DictReader(f)
+        for ligne in lecteur:
+            if est_manquant(ligne['utilisateur1']) or est_manquant(ligne['utilisateur2']):
+                nb_incompletes += 1
+                continue
+            ami1 = index.setdefault(ligne['utilisateur1'], len(index))
+            ami2 = index.setdefault(ligne['utilisateur2'], len(index))
+            paires.append((ami1, ami2))
+    
+    if not silencieux:
+        print(f"✓ Données chargées: {len(paires) + nb_incompletes} relations trouvées")
+        if nb_incompletes:
+            print(f"  ⚠ {nb_incompletes} relation(s) sans utilisateur ignorée(s)")
+    
+    aretes = np.array(paires, dtype=np.int64).reshape(-1, 2)
+    return list(index), aretes[:, 0], aretes[:, 1]
+
+
+def construire_csr_depuis_aretes(nb_noeuds, sources, cibles, politique_boucles='supprimer'):
+    """
+    Construit les tableaux CSR directement depuis une liste de relations.
+    
+    Les doublons sont fusionnés en poids comme dans construire_graphe.
+    Une boucle n'apparaît qu'une fois dans la ligne de son noeud.
+    
+    Retourne: (indptr, indices, poids)
+    """
+    petits, grands, poids_aretes, nb_boucles = agreger_aretes(sources, cibles, nb_noeuds, politique_boucles)
+    
+    # Chaque arête dans les deux sens (une seule fois pour les boucles)
+    boucles = petits == grands
+    lignes = np.concatenate([petits, grands[~boucles]])
+    colonnes = np.concatenate([grands, petits[~boucles]])
+    valeurs = np.concatenate([poids_aretes, poids_aretes[~boucles]])
+    
+    ordre = np.lexsort((colonnes, lignes))
+    indptr = np.zeros(nb_noeuds + 1, dtype=np.int64)
+    np.cumsum(np.bincount(lignes, minlength=nb_noeuds), out=indptr[1:])
+    indices = colonnes[ordre]
+    poids = valeurs[ordre].astype(np.float64)
+    
+    return indptr, indices, poids
+
+
+def afficher_informations_graphe(G, silencieux=False, top_k=None, rapide=False):
     """
     Affiche les informations du graphe.
+    
+    Arguments:
+        G: le graphe
+        silencieux: si True, calcule sans rien afficher
+        top_k: nombre d'utilisateurs les plus connectés affichés (par défaut ecriture.TOP_K)
+        rapide: si True, seulement les métriques peu coûteuses (voir statistiques)
+    
+    Retourne le dictionnaire des statistiques
     """
-    # Calculer les statistiques de base
-    nb_noeuds = G.number_of_nodes()
-    nb_aretes = G.number_of_edges()
-    degre_moyen = sum(dict(G.degree()).values()) / nb_noeuds
-    densite = nx.density(G)
-    est_connexe = nx.is_connected(G)
+    from src.ecriture import TOP_K
+    from src.statistiques import calculer_degres, calculer_statistiques, afficher_statistiques
+    
+    if top_k is None:
+        top_k = TOP_K
+    
+    # Calculer les statistiques sur les tableaux CSR
+    noeuds, indptr, indices, poids = construire_csr(G)
+    degres = calculer_degres(indptr, indices)
+    stats = calculer_statistiques(indptr, indices, degres, rapide=rapide)
     
     # Afficher
-    print("\n" + "="*50)
-    print("       INFORMATIONS DU GRAPHE")
-    print("="*50)
-    print(f"  Nombre de nœuds (utilisateurs): {nb_noeuds}")
-    print(f"  Nombre d'arêtes (relations):    {nb_aretes}")
-    print(f"  Degré moyen:                    {degre_moyen:.2f}")
-    print(f"  Densité du graphe:              {densite:.4f}")
-    print(f"  Graphe connexe:                 {'Oui' if est_connexe else 'Non'}")
-    print("="*50)
-    
-    # Afficher le degré de chaque utilisateur
-    print("\n  Degré de chaque utilisateur:")
-    print("  " + "-"*30)
-    for nom in G.nodes():
-        degre = G.degree(nom)
-        print(f"    {nom}: {degre} ami(s)")
-    
-    return {
-        'nb_noeuds': nb_noeuds,
-        'nb_aretes': nb_aretes,
-        'degre_moyen': degre_moyen,
-        'densite': densite
-    }
-
-
-def charger_graphe_complet(chemin_csv):
+    if not silencieux:
+        afficher_statistiques(stats, noeuds, degres, top_k)
+    
+    return stats
+
+
+def charger_graphe_complet(chemin_csv, politique_boucles='supprimer', silencieux=False):
     """
     Charge les données et construit le graphe en une seule étape.
     """
-    df = charger_donnees(chemin_csv)
-    G = construire_graphe(df)
+    df = charger_donnees(chemin_csv, silencieux=silencieux)
+    G = construire_graphe(df, politique_boucles, silencieux)
     return G
 
 
 # === Test du module ===
 if __name__ == "__main__":
+    # Lancé comme script (python src/graphe.py): rendre le paquet src importable
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    
     # Chemin vers le fichier CSV
     chemin = './data/reseau_amis.csv'
     
@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+"""
+Module d'index des communautés pour les requêtes par utilisateur.
+Construit une fois à partir d'un résultat, puis ouvert en mémoire projetée
+(np.load avec mmap_mode='r'): une requête ne lit que les quelques octets utiles.
+
+Contenu du dossier de l'index (un fichier .npy par tableau):
+    noms_octets, noms_decalages   noms UTF-8 triés, mis bout à bout (le rang sert d'identifiant)
+    communautes                   communauté de chaque noeud (int32)
+    indptr, separation, indices   voisins au format CSR: d'abord ceux de la même communauté
+                                  (indptr[i]:separation[i]), puis les autres (separation[i]:indptr[i+1])
+    comm_indptr, comm_indices, comm_poids
+                                  communautés voisines de chaque communauté et poids des arêtes entre elles
+    meta.json                     écrit en dernier: un index sans meta.json est incomplet
+"""
+
+import json
+import os
+
+import numpy as np
+
+from src.graphe import charger_graphe_complet, construire_csr
+
+
+# Version du format, vérifiée à l'ouverture
+VERSION_INDEX = 1
+
+TABLEAUX = ('noms_octets', 'noms_decalages', 'communautes', 'indptr', 'separation',
+            'indices', 'comm_indptr', 'comm_indices', 'comm_poids')
+
+
+def construire_index(G, partition, dossier, algorithme=None, modularite=None):
+    """
+    Construit l'index des communautés d'un résultat et l'écrit dans dossier.
+
+    Arguments:
+        G: le graphe
+        partition: dictionnaire {utilisateur: numéro_communauté}
+        dossier: dossier de sortie (créé si besoin)
+        algorithme: nom de l'algorithme (informatif)
+        modularite: modularité de la partition (informative)
+
+    Retourne le contenu de meta.json
+    """
+    noeuds, indptr, indices, poids = construire_csr(G)
+    n = len(noeuds)
+
+    # Renuméroter les noeuds dans l'ordre de leur nom encodé (recherche dichotomique)
+    noms = [str(nom).encode('utf-8') for nom in noeuds]
+    ordre = sorted(range(n), key=noms.__getitem__)
+    rang = np.empty(n, dtype=np.int64)
+    rang[ordre] = np.arange(n)
+
+    noms_octets = np.frombuffer(b''.join(noms[i] for i in ordre), dtype=np.uint8)
+    noms_decalages = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum([len(noms[i]) for i in ordre], out=noms_decalages[1:])
+
+    # Communautés renumérotées de 0 à nb_communautes - 1
+    bruts = np.array([partition[nom] for nom in noeuds])
+    _, labels = np.unique(bruts, return_inverse=True)
+    communautes = np.empty(n, dtype=np.int32)
+    communautes[rang] = labels
+    nb_communautes = int(communautes.max()) + 1 if n else 0
+
+    # Arêtes avec les nouveaux identifiants
+    lignes = rang[np.repeat(np.arange(n), np.diff(indptr))]
+    colonnes = rang[indices]
+    autre = communautes[lignes] != communautes[colonnes]
+
+    # Chaque ligne: voisins de la même communauté, puis les autres (triés par identifiant)
+    tri = np.lexsort((colonnes, autre, lignes))
+    nouveaux_indices = colonnes[tri].astype(np.int32)
+    degres = np.bincount(lignes, minlength=n)
+    nouveau_indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(degres, out=nouveau_indptr[1:])
+    separation = nouveau_indptr[:-1] + np.bincount(lignes[~autre], minlength=n)
+
+    # Graphe des communautés: un couple par sens, poids cumulés
+    cu, cv = communautes[lignes[autre]], communautes[colonnes[autre]]
+    cles, inverse = np.unique(cu.astype(np.int64) * nb_communautes + cv, return_inverse=True)
+    comm_poids = np.bincount(inverse, weights=poids[autre], minlength=len(cles))
+    comm_indices = (cles % max(nb_communautes, 1)).astype(np.int32)
+    comm_indptr = np.zeros(nb_communautes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(cles // max(nb_communautes, 1), minlength=nb_communautes), out=comm_indptr[1:])
+
+    tableaux = {
+        'noms_octets': noms_octets,
+        'noms_decalages': noms_decalages,
+        'communautes': communautes,
+        'indptr': nouveau_indptr,
+        'separation': separation,
+        'indices': nouveaux_indices,
+        'comm_indptr': comm_indptr,
+        'comm_indices': comm_indices,
+        'comm_poids': comm_poids,
+    }
+
+    # meta.json en dernier: un index interrompu reste reconnaissable
+    os.makedirs(dossier, exist_ok=True)
+    chemin_meta = os.path.join(dossier, "meta.json")
+    if os.path.exists(chemin_meta):
+        os.remove(chemin_meta)
+    for nom, tableau in tableaux.items():
+        np.save(os.path.join(dossier, f"{nom}.npy"), tableau)
+
+    meta = {
+        'version': VERSION_INDEX,
+        'nb_noeuds': n,
+        'nb_aretes': G.number_of_edges(),
+        'nb_communautes': nb_communautes,
+        'algorithme': algorithme,
+        'modularite': modularite,
+    }
+    with open(chemin_meta, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+
+    print(f"  ✓ Index écrit: {dossier} ({n} utilisateurs, {nb_communautes} communautés)")
+    return meta
+
+
+class IndexCommunautes:
+    """
+    Index ouvert en mémoire projetée, pour répondre aux requêtes par utilisateur.
+
+    Le nom d'un utilisateur est retrouvé par recherche dichotomique dans la
+    table triée (O(log n)); ensuite chaque requête est une lecture directe
+    dans les tableaux (communauté en O(1), voisins en une tranche contiguë).
+    """
+
+    def __init__(self, dossier):
+        chemin_meta = os.path.join(dossier, "meta.json")
+        if not os.path.exists(chemin_meta):
+            raise FileNotFoundError(f"Index absent ou incomplet: {dossier}")
+        with open(chemin_meta, encoding='utf-8') as f:
+            self.meta = json.load(f)
+        if self.meta['version'] != VERSION_INDEX:
+            raise ValueError(f"Version d'index non supportée: {self.meta['version']}")
+
+        self.dossier = dossier
+        for nom in TABLEAUX:
+            setattr(self, nom, np.load(os.path.join(dossier, f"{nom}.npy"), mmap_mode='r'))
+
+        # Vues Python sur les mêmes pages: la recherche dichotomique fait
+        # beaucoup de petites lectures, bien plus rapides sans objet numpy
+        self._octets = memoryview(self.noms_octets)
+        self._decalages = memoryview(self.noms_decalages)
+        self._communautes = memoryview(self.communautes)
+
+    def __len__(self):
+        return self.meta['nb_noeuds']
+
+    def __contains__(self, nom):
+        return self._chercher(nom) is not None
+
+    def nom(self, i):
+        """
+        Retourne le nom de l'utilisateur d'identifiant i.
+        """
+        return self._octets[self._decalages[i]:self._decalages[i + 1]].tobytes().decode('utf-8')
+
+    def _chercher(self, nom):
+        """
+        Recherche dichotomique du nom dans la table triée (None si absent).
+        """
+        cle = str(nom).encode('utf-8')
+        bas, haut = 0, len(self)
+        while bas < haut:
+            milieu = (bas + haut) // 2
+            if self._octets[self._decalages[milieu]:self._decalages[milieu + 1]].tobytes() < cle:
+                bas = milieu + 1
+            else:
+                haut = milieu
+
+        if bas < len(self):
+            if self._octets[self._decalages[bas]:self._decalages[bas + 1]].tobytes() == cle:
+                return bas
+        return None
+
+    def identifiant(self, nom):
+        """
+        Retourne l'identifiant de l'utilisateur (KeyError s'il est inconnu).
+        """
+        i = self._chercher(nom)
+        if i is None:
+            raise KeyError(f"Utilisateur inconnu: {nom}")
+        return i
+
+    def communaute(self, nom):
+        """
+        Retourne la communauté de l'utilisateur.
+        """
+        return self._communautes[self.identifiant(nom)]
+
+    def amis_meme_communaute(self, nom):
+        """
+        Retourne les amis de l'utilisateur qui sont dans sa communauté.
+        """
+        i = self.identifiant(nom)
+        return [self.nom(j) for j in self.indices[self.indptr[i]:self.separation[i]]]
+
+    def amis_autres_communautes(self, nom):
+        """
+        Retourne les amis de l'utilisateur hors de sa communauté: [(ami, communauté), ...]
+        """
+        i = self.identifiant(nom)
+        voisins = self.indices[self.separation[i]:self.indptr[i + 1]]
+        return [(self.nom(j), int(self.communautes[j])) for j in voisins]
+
+    def communautes_voisines(self, nom):
+        """
+        Retourne les communautés qui bordent celle de l'utilisateur,
+        avec le poids des arêtes qui les relient: [(communauté, poids), ...]
+        """
+        c = self.communaute(nom)
+        debut, fin = self.comm_indptr[c], self.comm_indptr[c + 1]
+        return [(int(v), float(p)) for v, p in zip(self.comm_indices[debut:fin], self.comm_poids[debut:fin])]
+
+
+def afficher_requete(index, nom):
+    """
+    Affiche toutes les réponses de l'index pour un utilisateur.
+    """
+    print("\n" + "="*50)
+    print(f"   UTILISATEUR: {nom}")
+    print("="*50)
+
+    if nom not in index:
+        print("  ⚠ Utilisateur absent de l'index")
+        print("="*50)
+        return
+
+    print(f"  Communauté:                {index.communaute(nom)}")
+    print(f"  Amis dans sa communauté:   {', '.join(index.amis_meme_communaute(nom)) or '-'}")
+    autres = index.amis_autres_communautes(nom)
+    print(f"  Amis hors communauté:      {', '.join(f'{a} ({c})' for a, c in autres) or '-'}")
+    voisines = index.communautes_voisines(nom)
+    print(f"  Communautés voisines:      {', '.join(f'{c} (poids {p:g})' for c, p in voisines) or '-'}")
+    print("="*50)
+
+
+# === Test du module ===
+if __name__ == "__main__":
+    import time
+    from src.louvain import executer_louvain
+
+    # Chemin vers les données
+    chemin = os.path.join(os.path.dirname(__file__), "..", "data", "reseau_amis.csv")
+
+    # Charger le graphe et détecter les communautés
+    print("Chargement du graphe...")
+    G = charger_graphe_complet(chemin)
+    partition, modularite, communautes = executer_louvain(G, silencieux=True)
+
+    # Construire puis rouvrir l'index
+    dossier = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", "resultats", "index"))
+    construire_index(G, partition, dossier, 'louvain', modularite)
+    index = IndexCommunautes(dossier)
+
+    nom = index.nom(0)
+    afficher_requete(index, nom)
+
+    # Durée moyenne d'une requête
+    debut = time.perf_counter()
+    for _ in range(10000):
+        index.communaute(nom)
+    print(f"\n  Durée d'une requête communauté: {(time.perf_counter() - debut) * 100:.1f} µs")
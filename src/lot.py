@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+"""
+Module de traitement par lots.
+Applique chargement, détection, analyse (et rendu) à de nombreux fichiers CSV.
+"""
+
+import argparse
+import contextlib
+import csv
+import glob
+import hashlib
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+
+# Colonnes de la ligne de résumé écrite pour chaque graphe
+CHAMPS = [
+    'fichier', 'nb_noeuds', 'nb_aretes', 'nb_communautes', 'modularite',
+    'densite_moyenne', 'total_aretes_internes', 'total_aretes_externes',
+    'temps', 'depuis_cache', 'erreur'
+]
+
+# Version du contenu des résumés en cache (à changer si les colonnes changent)
+VERSION_CACHE = 2
+
+
+def lister_fichiers(entree):
+    """
+    Liste les fichiers CSV à traiter.
+
+    Arguments:
+        entree: un dossier (tous ses .csv) ou un motif glob (ex: "exports/*.csv")
+
+    Retourne une liste triée de chemins
+    """
+    if os.path.isdir(entree):
+        return sorted(glob.glob(os.path.join(entree, "*.csv")))
+    return sorted(glob.glob(entree))
+
+
+def chemin_cache(chemin_csv, dossier_cache, options=None):
+    """
+    Construit le chemin du résumé en cache pour un fichier CSV.
+
+    L'empreinte couvre le chemin absolu (pas de collision entre fichiers de
+    même nom) et les options de calcul: un résumé calculé avec d'autres
+    options n'est jamais réutilisé.
+    """
+    cle = json.dumps({'chemin': os.path.abspath(chemin_csv), 'version': VERSION_CACHE,
+                      'options': options or {}}, sort_keys=True)
+    empreinte = hashlib.sha1(cle.encode('utf-8')).hexdigest()[:10]
+    nom = os.path.splitext(os.path.basename(chemin_csv))[0]
+    return os.path.join(dossier_cache, f"{nom}_{empreinte}.json")
+
+
+def lire_cache(chemin_csv, dossier_cache, rendu=False, options=None):
+    """
+    Retourne le résumé en cache s'il est plus récent que le CSV, sinon None.
+
+    Si le rendu est demandé, l'image doit aussi être présente dans le cache.
+    Un fichier de cache illisible est ignoré (le graphe sera recalculé).
+    """
+    cache = chemin_cache(chemin_csv, dossier_cache, options)
+    if not os.path.exists(cache):
+        return None
+    if os.path.getmtime(cache) < os.path.getmtime(chemin_csv):
+        return None
+    if rendu and not os.path.exists(os.path.splitext(cache)[0] + ".png"):
+        return None
+
+    try:
+        with open(cache, encoding='utf-8') as f:
+            ligne = json.load(f)
+    except (OSError, ValueError):
+        return None
+    ligne['depuis_cache'] = True
+    return ligne
+
+
+def traiter_fichier(chemin_csv, dossier_cache, rendu=False, options=None):
+    """
+    Traite un fichier CSV: chargement, Louvain, analyse et rendu optionnel.
+
+    Exécutée dans un processus du pool. Les affichages des modules sont
+    redirigés pour ne pas mélanger les sorties des différents processus.
+    Toute erreur (y compris en lisant ou en écrivant le cache) est notée
+    dans la colonne erreur: elle n'arrête jamais le lot.
+
+    Retourne la ligne de résumé (dictionnaire avec les colonnes de CHAMPS)
+    """
+    ligne = {'fichier': chemin_csv, 'depuis_cache': False, 'erreur': ''}
+    debut = time.time()
+    try:
+        en_cache = lire_cache(chemin_csv, dossier_cache, rendu, options)
+        if en_cache is not None:
+            return en_cache
+
+        # Imports ici: seuls les processus qui calculent vraiment les paient
+        from src.graphe import charger_graphe_complet
+        from src.louvain import executer_louvain
+        from src.analyse import executer_analyse
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            G = charger_graphe_complet(chemin_csv, (options or {}).get('politique_boucles', 'supprimer'))
+            partition, modularite, communautes = executer_louvain(G, silencieux=True)
+            analyses, stats = executer_analyse(G, communautes, silencieux=True)
+
+            if rendu:
+                from src.visualisation import dessiner_communautes, sauvegarder_image
+                import matplotlib.pyplot as plt
+
+                fig = dessiner_communautes(G, partition, os.path.basename(chemin_csv))
+                nom_image = os.path.splitext(os.path.basename(
+                    chemin_cache(chemin_csv, dossier_cache, options)))[0] + ".png"
+                sauvegarder_image(fig, nom_image, dossier=os.path.abspath(dossier_cache))
+                plt.close(fig)
+    except Exception as erreur:
+        ligne['erreur'] = f"{type(erreur).__name__}: {erreur}"
+        ligne['temps'] = time.time() - debut
+        return ligne
+
+    ligne.update({
+        'nb_noeuds': G.number_of_nodes(),
+        'nb_aretes': G.number_of_edges(),
+        'nb_communautes': len(communautes),
+        'modularite': modularite,
+        'densite_moyenne': stats['densite_moyenne'],
+        'total_aretes_internes': stats['total_aretes_internes'],
+        'total_aretes_externes': stats['total_aretes_externes'],
+        'temps': time.time() - debut
+    })
+
+    # Mettre en cache (écriture atomique). Un échec est signalé dans la
+    # ligne, qui reste valide: seul le cache manque au prochain lot
+    try:
+        cache = chemin_cache(chemin_csv, dossier_cache, options)
+        with open(cache + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump(ligne, f)
+        os.replace(cache + ".tmp", cache)
+    except Exception as erreur:
+        ligne['erreur'] = f"cache non écrit: {type(erreur).__name__}: {erreur}"
+
+    return ligne
+
+
+def ouvrir_sortie(chemin_sortie):
+    """
+    Ouvre le fichier de sortie (CSV ou JSONL selon l'extension).
+
+    Retourne: (fichier, fonction qui écrit une ligne)
+    """
+    f = open(chemin_sortie, 'w', encoding='utf-8', newline='')
+
+    if chemin_sortie.endswith('.jsonl'):
+        def ecrire(ligne):
+            f.write(json.dumps(ligne, ensure_ascii=False) + "\n")
+            f.flush()
+    else:
+        writer = csv.DictWriter(f, fieldnames=CHAMPS, extrasaction='ignore')
+        writer.writeheader()
+
+        def ecrire(ligne):
+            writer.writerow(ligne)
+            f.flush()
+
+    return f, ecrire
+
+
+def executer_lot(entree, chemin_sortie, nb_processus=None, dossier_cache="resultats/cache", rendu=False,
+                 politique_boucles='supprimer'):
+    """
+    Fonction principale: traite tous les fichiers avec un pool de processus.
+
+    Chaque résumé est écrit dès que son graphe est terminé; on ne garde
+    jamais tous les résultats en mémoire. Le nombre de tâches en cours est
+    borné pour que la liste des fichiers ne soit pas soumise d'un seul coup.
+
+    Arguments:
+        entree: dossier ou motif glob des fichiers CSV
+        chemin_sortie: fichier de résumé (.csv ou .jsonl)
+        nb_processus: taille du pool (par défaut, nombre de coeurs)
+        dossier_cache: dossier des résumés en cache (et des images)
+        rendu: génère aussi l'image des communautés de chaque graphe
+        politique_boucles: traitement des boucles (voir graphe.agreger_aretes),
+            inclus dans la clé du cache
+
+    Retourne un dictionnaire de compteurs
+    """
+    fichiers = lister_fichiers(entree)
+    options = {'politique_boucles': politique_boucles}
+    nb_processus = nb_processus or os.cpu_count() or 1
+    os.makedirs(dossier_cache, exist_ok=True)
+
+    compteurs = {'nb_fichiers': len(fichiers), 'nb_calcules': 0, 'nb_cache': 0, 'nb_erreurs': 0}
+    print(f"✓ {len(fichiers)} fichier(s) à traiter avec {nb_processus} processus")
+
+    f, ecrire = ouvrir_sortie(chemin_sortie)
+    try:
+        with ProcessPoolExecutor(max_workers=nb_processus) as executeur:
+            restants = iter(fichiers)
+            en_cours = set()
+
+            while True:
+                # Garder au plus 2 tâches par processus en attente
+                while len(en_cours) < 2 * nb_processus:
+                    chemin = next(restants, None)
+                    if chemin is None:
+                        break
+                    en_cours.add(executeur.submit(traiter_fichier, chemin, dossier_cache, rendu, options))
+
+                if not en_cours:
+                    break
+
+                termines, en_cours = wait(en_cours, return_when=FIRST_COMPLETED)
+                for tache in termines:
+                    ligne = tache.result()
+                    ecrire(ligne)
+
+                    if ligne.get('erreur'):
+                        compteurs['nb_erreurs'] += 1
+                        print(f"  ⚠ {ligne['fichier']}: {ligne['erreur']}")
+                    elif ligne['depuis_cache']:
+                        compteurs['nb_cache'] += 1
+                        print(f"  = {ligne['fichier']} (cache)")
+                    else:
+                        compteurs['nb_calcules'] += 1
+                        print(f"  ✓ {ligne['fichier']}: {ligne['nb_communautes']} communautés, "
+                              f"modularité {ligne['modularite']:.4f}")
+    finally:
+        f.close()
+
+    print(f"✓ Résumés écrits dans {chemin_sortie}")
+    return compteurs
+
+
+# === Point d'entrée ===
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Détection de communautés sur de nombreux fichiers CSV")
+    parser.add_argument("entree", help="dossier ou motif glob des fichiers CSV")
+    parser.add_argument("--sortie", default="resultats/lot.csv", help="fichier de résumé (.csv ou .jsonl)")
+    parser.add_argument("--processus", type=int, default=None, help="nombre de processus")
+    parser.add_argument("--cache", default="resultats/cache", help="dossier du cache")
+    parser.add_argument("--rendu", action="store_true", help="générer une image par graphe")
+    parser.add_argument("--boucles", choices=["supprimer", "conserver"], default="supprimer",
+                        help="traitement des relations d'un utilisateur avec lui-même")
+    args = parser.parse_args()
+
+    executer_lot(args.entree, args.sortie, args.processus, args.cache, args.rendu, args.boucles)
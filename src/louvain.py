@@ -5,12 +5,135 @@ Approche bottom-up (agglomérative) qui optimise la modularité.
 
 import community  # python-louvain
 import networkx as nx
+import numpy as np
 import os
 import sys
 
 # Ajouter le chemin parent pour importer graphe
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from src.graphe import charger_graphe_complet
+from src.graphe import charger_graphe_complet, construire_csr
+from src.modularite import NoyauModularite, modularite_graphe
+from src.ecriture import afficher_resume_communautes, TOP_K
+
+
+class DendrogrammeLouvain:
+    """
+    Hiérarchie complète construite par Louvain (un niveau par passe).
+    
+    Chaque niveau est gardé sous forme compacte: un tableau int32 qui
+    associe chaque communauté du niveau précédent (ou chaque noeud pour le
+    niveau 0) à sa communauté. Un niveau n'est matérialisé que lorsqu'on le
+    demande, et sa modularité et ses statistiques sont mises en cache.
+    """
+    
+    def __init__(self, G, dendrogramme):
+        """
+        Arguments:
+            G: le graphe
+            dendrogramme: liste de dictionnaires retournée par community.generate_dendrogram
+        """
+        self.G = G
+        self.noeuds = list(G.nodes())
+        
+        # Niveau 0: noeud -> communauté
+        index = {nom: i for i, nom in enumerate(self.noeuds)}
+        niveau_0 = np.empty(len(self.noeuds), dtype=np.int32)
+        for nom, num_comm in dendrogramme[0].items():
+            niveau_0[index[nom]] = num_comm
+        
+        # Niveaux suivants: communauté du niveau précédent -> communauté
+        self.correspondances = [niveau_0]
+        for niveau in dendrogramme[1:]:
+            correspondance = np.empty(len(niveau), dtype=np.int32)
+            for ancienne, nouvelle in niveau.items():
+                correspondance[ancienne] = nouvelle
+            self.correspondances.append(correspondance)
+        
+        # Caches remplis à la demande
+        self._noyau = None
+        self._labels = {0: niveau_0}
+        self._modularites = {}
+        self._statistiques = {}
+    
+    @property
+    def nb_niveaux(self):
+        """
+        Nombre de niveaux de la hiérarchie.
+        """
+        return len(self.correspondances)
+    
+    def _normaliser_niveau(self, niveau):
+        """
+        Accepte les indices négatifs (-1 = dernier niveau, le plus grossier).
+        """
+        if niveau < 0:
+            niveau += self.nb_niveaux
+        if not 0 <= niveau < self.nb_niveaux:
+            raise IndexError(f"Niveau {niveau} inexistant ({self.nb_niveaux} niveaux)")
+        return niveau
+    
+    def labels_niveau(self, niveau):
+        """
+        Retourne le tableau {indice_noeud: numéro_communauté} d'un niveau.
+        """
+        niveau = self._normaliser_niveau(niveau)
+        if niveau not in self._labels:
+            # Composer avec le niveau précédent (lui-même calculé à la demande)
+            self._labels[niveau] = self.correspondances[niveau][self.labels_niveau(niveau - 1)]
+        return self._labels[niveau]
+    
+    def partition_niveau(self, niveau):
+        """
+        Retourne la partition d'un niveau: {utilisateur: numéro_communauté}
+        """
+        labels = self.labels_niveau(niveau)
+        return dict(zip(self.noeuds, labels.tolist()))
+    
+    def communautes_niveau(self, niveau):
+        """
+        Retourne les communautés d'un niveau: [{membres_comm_0}, ...]
+        """
+        return obtenir_communautes(self.partition_niveau(niveau))
+    
+    def modularite_niveau(self, niveau):
+        """
+        Retourne la modularité d'un niveau (calculée une seule fois).
+        """
+        niveau = self._normaliser_niveau(niveau)
+        if niveau not in self._modularites:
+            # Le graphe CSR est préparé une fois pour tous les niveaux
+            if self._noyau is None:
+                noeuds, indptr, indices, poids = construire_csr(self.G)
+                self._noyau = NoyauModularite(indptr, indices, poids)
+            self._modularites[niveau] = self._noyau.modularite(self.labels_niveau(niveau))
+        return self._modularites[niveau]
+    
+    def statistiques_niveau(self, niveau):
+        """
+        Retourne les statistiques d'un niveau (calculées une seule fois).
+        """
+        niveau = self._normaliser_niveau(niveau)
+        if niveau not in self._statistiques:
+            tailles = np.bincount(self.labels_niveau(niveau))
+            self._statistiques[niveau] = {
+                'niveau': niveau,
+                'nb_communautes': len(tailles),
+                'taille_min': int(tailles.min()) if len(tailles) else 0,
+                'taille_max': int(tailles.max()) if len(tailles) else 0,
+                'taille_moyenne': float(tailles.mean()) if len(tailles) else 0.0,
+                'modularite': self.modularite_niveau(niveau)
+            }
+        return self._statistiques[niveau]
+
+
+def construire_dendrogramme(G):
+    """
+    Applique Louvain et garde toute la hiérarchie des communautés.
+    
+    Retourne un DendrogrammeLouvain
+    """
+    dendrogramme = community.generate_dendrogram(G)
+    return DendrogrammeLouvain(G, dendrogramme)
 
 
 def detecter_communautes(G):        
@@ -19,17 +142,18 @@ def detecter_communautes(G):
     
     Retourne un dictionnaire {utilisateur: numéro_communauté}
     """
-    partition = community.best_partition(G)
+    # Le dernier niveau du dendrogramme est la partition de best_partition
+    partition = construire_dendrogramme(G).partition_niveau(-1)
     return partition
 
 
-def calculer_modularite(G, partition):
+def calculer_modularite(G, partition, resolution=1.0):
     """
-    Calcule la modularité de la partition.
+    Calcule la modularité de la partition (voir src/modularite.py).
     
     Valeur entre -1 et 1. Plus c'est proche de 1, meilleure est la partition.
     """
-    modularite = community.modularity(partition, G)
+    modularite = modularite_graphe(G, partition, resolution)
     return modularite
 
 
@@ -52,44 +176,62 @@ def obtenir_communautes(partition):
     return communautes
 
 
-def afficher_communautes(partition):
+def afficher_communautes(partition, top_k=TOP_K):
     """
-    Affiche les communautés de manière lisible.
+    Affiche un résumé des communautés (seulement les top_k plus grandes).
     """
     communautes = obtenir_communautes(partition)
-    
+    afficher_resume_communautes(communautes, "COMMUNAUTÉS DÉTECTÉES (LOUVAIN)", top_k)
+    return communautes
+
+
+def afficher_dendrogramme(dendrogramme):
+    """
+    Affiche les statistiques de chaque niveau du dendrogramme.
+    """
     print("\n" + "="*50)
-    print("   COMMUNAUTÉS DÉTECTÉES (LOUVAIN)")
+    print("   HIÉRARCHIE LOUVAIN (DENDROGRAMME)")
     print("="*50)
-    print(f"\n  Nombre de communautés: {len(communautes)}\n")
+    print(f"\n  {'Niveau':<8} {'Comm.':<8} {'Taille max':<12} {'Modularité':<10}")
+    print("  " + "-"*40)
     
-    for i, membres in enumerate(communautes):
-        print(f"  Communauté {i+1}: {sorted(membres)}")
+    for niveau in range(dendrogramme.nb_niveaux):
+        stats = dendrogramme.statistiques_niveau(niveau)
+        print(f"  {niveau:<8} {stats['nb_communautes']:<8} {stats['taille_max']:<12} {stats['modularite']:<10.4f}")
     
     print("="*50)
-    
-    return communautes
 
 
-def executer_louvain(G):
+def executer_louvain(G, silencieux=False, top_k=TOP_K, garder_dendrogramme=False):
     """
     Fonction principale qui exécute tout le processus Louvain.
     
-    Retourne: (partition, modularité, communautés)
+    Arguments:
+        G: le graphe
+        silencieux: si True, n'affiche rien
+        top_k: nombre de communautés montrées dans le résumé
+        garder_dendrogramme: si True, retourne aussi la hiérarchie de ce calcul
+    
+    Retourne: (partition, modularité, communautés),
+    suivi du DendrogrammeLouvain si garder_dendrogramme est True
     """
-    # Détecter les communautés
-    partition = detecter_communautes(G)
+    # Détecter les communautés (dernier niveau de la hiérarchie)
+    dendrogramme = construire_dendrogramme(G)
+    partition = dendrogramme.partition_niveau(-1)
     
-    # Calculer la modularité
-    modularite = calculer_modularite(G, partition)
+    # Calculer la modularité (mise en cache dans le dendrogramme)
+    modularite = dendrogramme.modularite_niveau(-1)
     
     # Obtenir la liste des communautés
     communautes = obtenir_communautes(partition)
     
     # Afficher les résultats
-    afficher_communautes(partition)
-    print(f"\n  Modularité: {modularite:.4f}")
+    if not silencieux:
+        afficher_communautes(partition, top_k)
+        print(f"\n  Modularité: {modularite:.4f}")
     
+    if garder_dendrogramme:
+        return partition, modularite, communautes, dendrogramme
     return partition, modularite, communautes
 
 
@@ -104,4 +246,7 @@ if __name__ == "__main__":
     
     # Exécuter Louvain
     print("\nApplication de l'algorithme de Louvain...")
-    partition, modularite, communautes = executer_louvain(G)
+    partition, modularite, communautes, dendrogramme = executer_louvain(G, garder_dendrogramme=True)
+    
+    # Explorer la hiérarchie du même calcul
+    afficher_dendrogramme(dendrogramme)
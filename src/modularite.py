@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+"""
+Module de calcul de la modularité, commun à tous les algorithmes.
+Travaille directement sur les tableaux CSR et un tableau de labels, avec numpy.
+
+Pour une partition en communautés c, avec m le poids total des arêtes,
+L_c le poids des arêtes internes à c et D_c la somme des degrés de c:
+
+    Q = somme sur c de  L_c / m  -  resolution * (D_c / 2m)²
+
+Une boucle compte pour 2 dans le degré de son noeud, comme dans networkx.
+"""
+
+import os
+
+import numpy as np
+
+from src.graphe import charger_graphe_complet, construire_csr
+
+
+class NoyauModularite:
+    """
+    Graphe CSR préparé une fois pour évaluer rapidement de nombreuses partitions.
+
+    Les degrés, le poids total et la liste des arêtes sont calculés à la
+    construction; chaque évaluation n'est ensuite qu'une poignée
+    d'opérations vectorisées sur les labels.
+    """
+
+    def __init__(self, indptr, indices, poids=None, resolution=1.0):
+        """
+        Arguments:
+            indptr, indices, poids: le graphe au format CSR (poids à 1 si None)
+            resolution: > 1 favorise des communautés plus petites, < 1 plus grandes
+        """
+        n = len(indptr) - 1
+        if poids is None:
+            poids = np.ones(len(indices), dtype=np.float64)
+
+        self.indptr = indptr
+        self.indices = indices
+        self.resolution = resolution
+        self.lignes = np.repeat(np.arange(n), np.diff(indptr))
+
+        # Une boucle n'apparaît qu'une fois dans la ligne de son noeud:
+        # on la double pour qu'elle compte deux fois dans le degré
+        self.boucles = self.lignes == indices
+        self.poids = np.where(self.boucles, 2.0 * poids, poids)
+
+        self.degres = np.bincount(self.lignes, weights=self.poids, minlength=n)
+        self.m = self.degres.sum() / 2
+
+    def _nb_labels(self, *tableaux):
+        return max((int(t.max()) + 1 for t in tableaux if len(t)), default=0)
+
+    def contributions(self, labels):
+        """
+        Retourne la contribution de chaque communauté à la modularité
+        (tableau indexé par label, dont la somme vaut Q).
+
+        Les noeuds de label -1 (dans aucune communauté) sont ignorés: la
+        contribution d'une communauté ne dépend que de ses propres membres.
+        """
+        nb_labels = self._nb_labels(labels)
+        if self.m == 0:
+            return np.zeros(nb_labels)
+
+        places = labels >= 0
+        internes = (labels[self.lignes] == labels[self.indices]) & places[self.lignes]
+        poids_internes = np.bincount(labels[self.lignes[internes]], weights=self.poids[internes],
+                                     minlength=nb_labels) / 2
+        degres_communautes = np.bincount(labels[places], weights=self.degres[places], minlength=nb_labels)
+        return poids_internes / self.m - self.resolution * (degres_communautes / (2 * self.m)) ** 2
+
+    def modularite(self, labels):
+        """
+        Retourne la modularité de la partition donnée par labels.
+        """
+        return float(self.contributions(labels).sum())
+
+    def poids_vers_communautes(self, noeuds, communautes, labels):
+        """
+        Poids des arêtes de chaque noeud vers une communauté donnée (boucles exclues).
+
+        Arguments:
+            noeuds, communautes: tableaux de même longueur (une requête par case)
+            labels: label actuel de chaque noeud
+
+        Retourne un tableau avec, pour chaque requête, le poids de noeuds[q] vers communautes[q]
+        """
+        nb_labels = self._nb_labels(labels, communautes)
+
+        # Tous les voisins des noeuds demandés, requête par requête
+        debuts = self.indptr[noeuds]
+        degres = self.indptr[noeuds + 1] - debuts
+        decalages = np.cumsum(degres) - degres
+        positions = np.arange(int(degres.sum())) - np.repeat(decalages - debuts, degres)
+        requetes = np.repeat(np.arange(len(noeuds)), degres)
+        garder = ~self.boucles[positions]
+        positions, requetes = positions[garder], requetes[garder]
+
+        # Somme des poids par couple (requête, label voisin)
+        cles = requetes * nb_labels + labels[self.indices[positions]]
+        cles_uniques, inverse = np.unique(cles, return_inverse=True)
+        sommes = np.bincount(inverse, weights=self.poids[positions], minlength=len(cles_uniques))
+
+        return _chercher(cles_uniques, sommes, np.arange(len(noeuds)) * nb_labels + communautes)
+
+    def gains_deplacements(self, labels, noeuds, cibles):
+        """
+        Calcule d'un coup le gain de modularité de nombreux déplacements.
+
+        Chaque gain est évalué seul, à partir de la partition actuelle:
+        les déplacements ne se cumulent pas.
+
+        Arguments:
+            labels: label actuel de chaque noeud
+            noeuds: noeuds à déplacer
+            cibles: communauté d'arrivée de chaque noeud
+
+        Retourne le tableau des ΔQ (0 si la cible est la communauté actuelle)
+        """
+        noeuds = np.asarray(noeuds)
+        cibles = np.asarray(cibles)
+        if self.m == 0 or len(noeuds) == 0:
+            return np.zeros(len(noeuds))
+
+        actuelles = labels[noeuds]
+        nb_labels = self._nb_labels(labels, cibles)
+        degres_communautes = np.bincount(labels, weights=self.degres, minlength=nb_labels)
+        k = self.degres[noeuds]
+
+        # Liens gagnés vers la cible, liens perdus avec l'ancienne communauté
+        vers_cible = self.poids_vers_communautes(noeuds, cibles, labels)
+        vers_actuelle = self.poids_vers_communautes(noeuds, actuelles, labels)
+
+        gains = (vers_cible - vers_actuelle) / self.m - self.resolution * k * (
+            degres_communautes[cibles] - degres_communautes[actuelles] + k) / (2 * self.m ** 2)
+        return np.where(cibles == actuelles, 0.0, gains)
+
+    def gains_fusions(self, labels, communautes_a, communautes_b):
+        """
+        Calcule d'un coup le gain de modularité de nombreuses fusions de deux communautés.
+
+        Arguments:
+            labels: label actuel de chaque noeud
+            communautes_a, communautes_b: couples de communautés à fusionner
+
+        Retourne le tableau des ΔQ (0 pour une communauté fusionnée avec elle-même)
+        """
+        communautes_a = np.asarray(communautes_a)
+        communautes_b = np.asarray(communautes_b)
+        if self.m == 0 or len(communautes_a) == 0:
+            return np.zeros(len(communautes_a))
+
+        nb_labels = self._nb_labels(labels, communautes_a, communautes_b)
+        degres_communautes = np.bincount(labels, weights=self.degres, minlength=nb_labels)
+
+        # Poids entre chaque couple de communautés (chaque arête vue une fois par sens)
+        externes = labels[self.lignes] != labels[self.indices]
+        cles = labels[self.lignes[externes]] * nb_labels + labels[self.indices[externes]]
+        cles_uniques, inverse = np.unique(cles, return_inverse=True)
+        sommes = np.bincount(inverse, weights=self.poids[externes], minlength=len(cles_uniques))
+        entre = _chercher(cles_uniques, sommes, communautes_a * nb_labels + communautes_b)
+
+        gains = entre / self.m - self.resolution * degres_communautes[communautes_a] * \
+            degres_communautes[communautes_b] / (2 * self.m ** 2)
+        return np.where(communautes_a == communautes_b, 0.0, gains)
+
+
+def _chercher(cles_triees, valeurs, cles):
+    """
+    Retourne la valeur associée à chaque clé (0 si la clé est absente).
+    """
+    if len(cles_triees) == 0:
+        return np.zeros(len(cles))
+    positions = np.minimum(np.searchsorted(cles_triees, cles), len(cles_triees) - 1)
+    return np.where(cles_triees[positions] == cles, valeurs[positions], 0.0)
+
+
+def calculer_modularite(indptr, indices, poids, labels, resolution=1.0):
+    """
+    Calcule la modularité d'une partition donnée par un tableau de labels.
+
+    Pour évaluer plusieurs partitions du même graphe, mieux vaut créer
+    un NoyauModularite une fois et le réutiliser.
+    """
+    return NoyauModularite(indptr, indices, poids, resolution).modularite(labels)
+
+
+def labels_depuis_partition(noeuds, partition):
+    """
+    Convertit {utilisateur: communauté} en tableau de labels 0..k-1 aligné sur noeuds.
+    """
+    bruts = np.array([partition[nom] for nom in noeuds])
+    _, labels = np.unique(bruts, return_inverse=True)
+    return labels
+
+
+def labels_depuis_communautes(noeuds, communautes):
+    """
+    Convertit une liste de sets [{membres_0}, ...] en tableau de labels aligné sur noeuds.
+
+    Les noeuds qui ne sont dans aucune communauté reçoivent le label -1
+    (ignoré par NoyauModularite.contributions).
+    """
+    index = {nom: i for i, nom in enumerate(noeuds)}
+    labels = np.full(len(noeuds), -1, dtype=np.int64)
+    for num_comm, membres in enumerate(communautes):
+        labels[[index[nom] for nom in membres]] = num_comm
+    return labels
+
+
+def modularite_graphe(G, partition, resolution=1.0):
+    """
+    Calcule la modularité d'une partition {utilisateur: communauté} d'un graphe networkx.
+    """
+    noeuds, indptr, indices, poids = construire_csr(G)
+    return calculer_modularite(indptr, indices, poids, labels_depuis_partition(noeuds, partition), resolution)
+
+
+# === Test du module ===
+if __name__ == "__main__":
+    from src.louvain import detecter_communautes
+
+    # Chemin vers les données
+    chemin = os.path.join(os.path.dirname(__file__), "..", "data", "reseau_amis.csv")
+
+    # Charger le graphe et détecter les communautés
+    print("Chargement du graphe...")
+    G = charger_graphe_complet(chemin)
+    noeuds, indptr, indices, poids = construire_csr(G)
+    labels = labels_depuis_partition(noeuds, detecter_communautes(G))
+
+    noyau = NoyauModularite(indptr, indices, poids)
+    print(f"\n  Modularité: {noyau.modularite(labels):.4f}")
+    for c, q in enumerate(noyau.contributions(labels)):
+        print(f"    Communauté {c + 1}: {q:+.4f}")
+
+    # Tous les déplacements d'un noeud vers la communauté d'un de ses voisins
+    candidats = labels[noyau.lignes] != labels[indices]
+    noeuds_candidats = noyau.lignes[candidats]
+    cibles = labels[indices[candidats]]
+    gains = noyau.gains_deplacements(labels, noeuds_candidats, cibles)
+
+    if len(gains) > 0 and gains.max() > 0:
+        meilleur = int(np.argmax(gains))
+        print(f"\n  Meilleur déplacement: {noeuds[noeuds_candidats[meilleur]]} → communauté "
+              f"{cibles[meilleur] + 1} (ΔQ = {gains[meilleur]:+.4f})")
+    else:
+        print(f"\n  ✓ Aucun déplacement n'améliore la modularité ({len(gains)} testés)")
@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+"""
+Module de détection de communautés par propagation de labels.
+Approche rapide et approximative, pensée pour les très grands graphes.
+"""
+
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import os
+
+from src.graphe import charger_graphe_complet, construire_csr
+from src.ecriture import afficher_resume_communautes, TOP_K
+from src.louvain import calculer_modularite, obtenir_communautes
+
+
+# Tableaux CSR et labels partagés par les processus du mode multi-coeurs
+_CSR_TRAVAILLEUR = None
+_LABELS_TRAVAILLEUR = None
+_MEMOIRE_TRAVAILLEUR = None
+
+
+def choisir_labels(lot, labels, indptr, indices, poids, rng):
+    """
+    Calcule le nouveau label de chaque noeud d'un lot, en une seule passe vectorisée.
+
+    Chaque noeud prend le label le plus lourd parmi ses voisins. En cas
+    d'égalité, il garde son label actuel s'il fait partie des meilleurs,
+    sinon on tire au hasard.
+
+    Arguments:
+        lot: tableau des indices des noeuds à mettre à jour
+        labels: labels actuels de tous les noeuds
+        indptr, indices, poids: le graphe au format CSR
+        rng: générateur aléatoire numpy (pour départager les égalités)
+
+    Retourne le tableau des nouveaux labels du lot
+    """
+    nouveaux = labels[lot].copy()
+    debuts = indptr[lot]
+    degres = indptr[lot + 1] - debuts
+    total = int(degres.sum())
+    if total == 0:
+        return nouveaux
+
+    # Positions de tous les voisins du lot dans le tableau indices
+    decalages = np.cumsum(degres) - degres
+    positions = np.arange(total) - np.repeat(decalages - debuts, degres)
+    lignes = np.repeat(np.arange(len(lot)), degres)
+
+    # Somme des poids par couple (noeud du lot, label voisin)
+    n = len(labels)
+    cles = lignes * n + labels[indices[positions]]
+    cles_uniques, inverse = np.unique(cles, return_inverse=True)
+    sommes = np.bincount(inverse, weights=poids[positions])
+    lignes_u = cles_uniques // n
+    labels_u = cles_uniques % n
+
+    # Trier par noeud, puis poids, puis label actuel, puis hasard:
+    # le meilleur candidat de chaque noeud est le dernier de son groupe
+    actuel = labels_u == nouveaux[lignes_u]
+    ordre = np.lexsort((rng.random(len(cles_uniques)), actuel, sommes, lignes_u))
+    lignes_triees = lignes_u[ordre]
+    derniers = np.flatnonzero(np.append(lignes_triees[1:] != lignes_triees[:-1], True))
+
+    nouveaux[lignes_triees[derniers]] = labels_u[ordre[derniers]]
+    return nouveaux
+
+
+def colorier(indptr, indices, graine=42):
+    """
+    Colorie le graphe pour que deux voisins n'aient jamais la même couleur.
+
+    À chaque tour, les noeuds non coloriés de plus forte priorité (tirée au
+    hasard) parmi leurs voisins non coloriés reçoivent la couleur du tour.
+
+    Retourne un tableau {indice_noeud: couleur}
+    """
+    n = len(indptr) - 1
+    rng = np.random.default_rng(graine)
+    priorites = rng.permutation(n)
+
+    # Liste des arêtes (sans les boucles)
+    sources = np.repeat(np.arange(n), np.diff(indptr))
+    masque = sources != indices
+    sources, cibles = sources[masque], indices[masque]
+
+    couleurs = np.full(n, -1, dtype=np.int64)
+    couleur = 0
+    while (couleurs < 0).any():
+        # On ne garde que les arêtes entre deux noeuds non coloriés
+        actives = (couleurs[sources] < 0) & (couleurs[cibles] < 0)
+        sources, cibles = sources[actives], cibles[actives]
+
+        # Plus forte priorité parmi les voisins non coloriés
+        max_voisins = np.full(n, -1, dtype=np.int64)
+        np.maximum.at(max_voisins, sources, priorites[cibles])
+
+        elus = (couleurs < 0) & (priorites > max_voisins)
+        couleurs[elus] = couleur
+        couleur += 1
+
+    return couleurs
+
+
+def _initialiser_travailleur(indptr, indices, poids, nom_memoire, n):
+    """
+    Initialise un processus du mode multi-coeurs avec le graphe CSR.
+
+    Les labels ne sont pas copiés: le processus lit directement le tableau
+    en mémoire partagée, que le processus principal met à jour.
+    """
+    global _CSR_TRAVAILLEUR, _LABELS_TRAVAILLEUR, _MEMOIRE_TRAVAILLEUR
+    _CSR_TRAVAILLEUR = (indptr, indices, poids)
+    _MEMOIRE_TRAVAILLEUR = shared_memory.SharedMemory(name=nom_memoire)
+    _LABELS_TRAVAILLEUR = np.ndarray(n, dtype=np.int64, buffer=_MEMOIRE_TRAVAILLEUR.buf)
+
+
+def _traiter_lot(lot, graine):
+    """
+    Tâche exécutée par un processus: nouveaux labels d'un lot.
+    """
+    indptr, indices, poids = _CSR_TRAVAILLEUR
+    return choisir_labels(lot, _LABELS_TRAVAILLEUR, indptr, indices, poids, np.random.default_rng(graine))
+
+
+def propager_labels(indptr, indices, poids, taille_lot=4096, max_iterations=100,
+                    seuil_arret=0.001, semi_synchrone=False, nb_processus=1, graine=42):
+    """
+    Applique la propagation de labels sur un graphe au format CSR.
+
+    Les noeuds sont mis à jour par lots sans arête interne (morceaux d'une
+    classe de couleur): aucun noeud d'un lot ne lit le label périmé d'un
+    voisin du même lot, le résultat est donc celui d'une mise à jour
+    séquentielle et ne peut pas osciller.
+
+    Arguments:
+        indptr, indices, poids: le graphe au format CSR
+        taille_lot: nombre maximal de noeuds mis à jour ensemble
+        max_iterations: nombre maximal de passes sur tous les noeuds
+        seuil_arret: on s'arrête quand la fraction de labels modifiés passe sous ce seuil
+        semi_synchrone: parcourt les classes de couleur toujours dans le même ordre
+            (sinon, ordre des classes et des noeuds tiré au hasard à chaque passe)
+        nb_processus: nombre de processus en mode semi-synchrone
+        graine: graine aléatoire (pour des résultats reproductibles)
+
+    Retourne un tableau de labels numérotés de 0 à nb_communautes - 1
+    """
+    n = len(indptr) - 1
+    rng = np.random.default_rng(graine)
+
+    # Lots = classes de couleur (deux voisins n'ont jamais la même couleur)
+    couleurs = colorier(indptr, indices, graine)
+    ordre = np.argsort(couleurs, kind='stable')
+    coupures = np.flatnonzero(np.diff(couleurs[ordre])) + 1
+    classes = np.split(ordre, coupures)
+
+    # En multi-processus, les labels vivent en mémoire partagée: seuls les
+    # indices de chaque lot sont envoyés aux processus
+    executeur = None
+    memoire = None
+    if semi_synchrone and nb_processus > 1:
+        memoire = shared_memory.SharedMemory(create=True, size=max(n, 1) * np.dtype(np.int64).itemsize)
+        labels = np.ndarray(n, dtype=np.int64, buffer=memoire.buf)
+        executeur = ProcessPoolExecutor(
+            max_workers=nb_processus,
+            initializer=_initialiser_travailleur,
+            initargs=(indptr, indices, poids, memoire.name, n)
+        )
+    else:
+        labels = np.empty(n, dtype=np.int64)
+    labels[:] = np.arange(n)
+
+    try:
+        for iteration in range(max_iterations):
+            nb_changements = 0
+
+            if semi_synchrone:
+                passe = classes
+            else:
+                passe = [rng.permutation(classes[c]) for c in rng.permutation(len(classes))]
+
+            for classe in passe:
+                # En multi-processus, au moins un lot par processus
+                taille = taille_lot
+                if executeur is not None:
+                    taille = max(1, min(taille_lot, -(-len(classe) // nb_processus)))
+                lots = [classe[d:d + taille] for d in range(0, len(classe), taille)]
+
+                # Les noeuds d'une classe ne sont pas voisins: on peut
+                # les mettre à jour en parallèle sans se gêner
+                if executeur is not None:
+                    graines = rng.integers(0, 2**32, size=len(lots))
+                    resultats = list(executeur.map(_traiter_lot, lots, graines))
+                else:
+                    resultats = [choisir_labels(lot, labels, indptr, indices, poids, rng) for lot in lots]
+
+                for lot, nouveaux in zip(lots, resultats):
+                    nb_changements += int((nouveaux != labels[lot]).sum())
+                    labels[lot] = nouveaux
+
+            # Arrêt anticipé: presque plus aucun label ne bouge
+            if nb_changements <= seuil_arret * n:
+                break
+        else:
+            if n > 0:
+                print(f"  ⚠ Propagation arrêtée après {max_iterations} itérations sans converger "
+                      f"({nb_changements} label(s) modifié(s) à la dernière passe)")
+
+        labels = labels.copy()
+    finally:
+        if executeur is not None:
+            executeur.shutdown()
+        if memoire is not None:
+            memoire.close()
+            memoire.unlink()
+
+    # Renuméroter les labels de 0 à nb_communautes - 1
+    _, labels = np.unique(labels, return_inverse=True)
+    return labels
+
+
+def detecter_communautes(G, **options):
+    """
+    Applique la propagation de labels pour détecter les communautés.
+
+    Les options sont transmises à propager_labels.
+
+    Retourne un dictionnaire {utilisateur: numéro_communauté}
+    """
+    noeuds, indptr, indices, poids = construire_csr(G)
+    labels = propager_labels(indptr, indices, poids, **options)
+    return {nom: int(label) for nom, label in zip(noeuds, labels)}
+
+
+def afficher_communautes(partition, top_k=TOP_K):
+    """
+    Affiche un résumé des communautés (seulement les top_k plus grandes).
+    """
+    communautes = obtenir_communautes(partition)
+    afficher_resume_communautes(communautes, "COMMUNAUTÉS DÉTECTÉES (PROPAGATION DE LABELS)", top_k)
+    return communautes
+
+
+def executer_propagation(G, silencieux=False, top_k=TOP_K, **options):
+    """
+    Fonction principale qui exécute tout le processus de propagation de labels.
+
+    Arguments:
+        G: le graphe
+        silencieux: si True, n'affiche rien
+        top_k: nombre de communautés montrées dans le résumé
+        options: transmises à propager_labels
+
+    Retourne: (partition, modularité, communautés)
+    """
+    # Détecter les communautés
+    partition = detecter_communautes(G, **options)
+
+    # Calculer la modularité
+    modularite = calculer_modularite(G, partition)
+
+    # Obtenir la liste des communautés
+    communautes = obtenir_communautes(partition)
+
+    # Afficher les résultats
+    if not silencieux:
+        afficher_communautes(partition, top_k)
+        print(f"\n  Modularité: {modularite:.4f}")
+
+    return partition, modularite, communautes
+
+
+# === Test du module ===
+if __name__ == "__main__":
+    # Chemin vers les données
+    chemin = os.path.join(os.path.dirname(__file__), "..", "data", "reseau_amis.csv")
+
+    # Charger le graphe
+    print("Chargement du graphe...")
+    G = charger_graphe_complet(chemin)
+
+    # Exécuter la propagation de labels
+    print("\nApplication de la propagation de labels...")
+    partition, modularite, communautes = executer_propagation(G)
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+"""
+Module de statistiques du graphe.
+Calcule toutes les statistiques à partir des tableaux CSR, avec numpy uniquement.
+"""
+
+import numpy as np
+
+from src.ecriture import TOP_K
+
+
+# Quantiles de degré rapportés
+QUANTILES = (0.25, 0.5, 0.75, 0.9, 0.99)
+
+# Nombre de tailles de composantes différentes affichées (les plus grandes)
+NB_TAILLES_AFFICHEES = 5
+
+
+def voisins_lot(indptr, indices, lot):
+    """
+    Retourne tous les voisins d'un lot de noeuds, mis bout à bout.
+    """
+    debuts = indptr[lot]
+    degres = indptr[lot + 1] - debuts
+    total = int(degres.sum())
+    decalages = np.cumsum(degres) - degres
+    positions = np.arange(total) - np.repeat(decalages - debuts, degres)
+    return indices[positions]
+
+
+def calculer_degres(indptr, indices):
+    """
+    Calcule le degré de chaque noeud (une boucle compte pour 2, comme networkx).
+    """
+    n = len(indptr) - 1
+    sources = np.repeat(np.arange(n), np.diff(indptr))
+    return np.diff(indptr) + np.bincount(sources[sources == indices], minlength=n)
+
+
+def composantes_connexes(indptr, indices):
+    """
+    Calcule la composante connexe de chaque noeud à partir des tableaux CSR.
+
+    Chaque noeud prend le plus petit numéro de ses voisins, et on raccourcit
+    les chaînes (saut de pointeurs) jusqu'à ce que plus rien ne change.
+
+    Retourne un tableau {indice_noeud: numéro de composante (plus petit noeud)}
+    """
+    n = len(indptr) - 1
+    sources = np.repeat(np.arange(n), np.diff(indptr))
+    labels = np.arange(n)
+
+    while True:
+        nouveaux = labels.copy()
+        np.minimum.at(nouveaux, sources, labels[indices])
+        np.minimum.at(nouveaux, labels, nouveaux)
+        nouveaux = nouveaux[nouveaux]
+        if np.array_equal(nouveaux, labels):
+            return labels
+        labels = nouveaux
+
+
+def parcours_largeur(indptr, indices, source):
+    """
+    Parcours en largeur depuis source, une frontière entière à la fois.
+
+    Retourne le tableau des distances (-1 pour les noeuds non atteints)
+    """
+    distances = np.full(len(indptr) - 1, -1, dtype=np.int64)
+    distances[source] = 0
+    frontiere = np.array([source])
+    profondeur = 0
+
+    while len(frontiere) > 0:
+        voisins = voisins_lot(indptr, indices, frontiere)
+        frontiere = np.unique(voisins[distances[voisins] < 0])
+        profondeur += 1
+        distances[frontiere] = profondeur
+
+    return distances
+
+
+def estimer_clustering(indptr, indices, echantillon):
+    """
+    Estime le coefficient de clustering moyen sur un échantillon de noeuds.
+
+    Pour chaque noeud: nombre de liens entre ses voisins / nombre de liens possibles.
+    Les noeuds de degré < 2 comptent pour 0 et les boucles sont ignorées
+    (comme networkx.average_clustering).
+    """
+    marques = np.zeros(len(indptr) - 1, dtype=bool)
+    coefficients = []
+
+    for v in echantillon:
+        voisins = indices[indptr[v]:indptr[v + 1]]
+        voisins = voisins[voisins != v]
+        k = len(voisins)
+        if k < 2:
+            coefficients.append(0.0)
+            continue
+
+        # Chaque lien entre deux voisins est vu depuis ses deux extrémités;
+        # la boucle d'un voisin (lui-même dans ses voisins) n'en est pas un
+        marques[voisins] = True
+        voisins_des_voisins = voisins_lot(indptr, indices, voisins)
+        origines = np.repeat(voisins, indptr[voisins + 1] - indptr[voisins])
+        liens = int(marques[voisins_des_voisins[voisins_des_voisins != origines]].sum()) // 2
+        marques[voisins] = False
+
+        coefficients.append(2 * liens / (k * (k - 1)))
+
+    return float(np.mean(coefficients)) if coefficients else 0.0
+
+
+def estimer_diametre(indptr, indices, sources):
+    """
+    Estime le diamètre par double balayage depuis quelques sources.
+
+    Depuis chaque source, on va au noeud le plus éloigné puis on mesure
+    son excentricité. Le résultat est une borne inférieure du diamètre
+    (souvent exacte en pratique).
+    """
+    diametre = 0
+    for source in sources:
+        distances = parcours_largeur(indptr, indices, source)
+        plus_loin = int(np.argmax(distances))
+        distances = parcours_largeur(indptr, indices, plus_loin)
+        diametre = max(diametre, int(distances.max()))
+    return diametre
+
+
+def calculer_statistiques(indptr, indices, degres=None, rapide=False,
+                          nb_echantillons=500, nb_sources=4, graine=42):
+    """
+    Calcule les statistiques du graphe à partir des tableaux CSR.
+
+    Arguments:
+        indptr, indices: le graphe au format CSR
+        degres: degrés déjà calculés (optionnel, sinon calculés ici)
+        rapide: si True, seulement les métriques en une passe (degrés, densité)
+        nb_echantillons: nombre de noeuds tirés pour estimer le clustering
+        nb_sources: nombre de sources pour estimer le diamètre
+        graine: graine aléatoire des échantillons
+
+    Retourne un dictionnaire de statistiques
+    """
+    n = len(indptr) - 1
+    if degres is None:
+        degres = calculer_degres(indptr, indices)
+    nb_aretes = int(degres.sum()) // 2
+
+    # === Métriques rapides (une passe sur les degrés) ===
+    stats = {
+        'nb_noeuds': n,
+        'nb_aretes': nb_aretes,
+        'degre_moyen': nb_aretes * 2 / n if n > 0 else 0.0,
+        'densite': nb_aretes / (n * (n - 1) / 2) if n > 1 else 0.0,
+        'degre_min': int(degres.min()) if n > 0 else 0,
+        'degre_max': int(degres.max()) if n > 0 else 0,
+        'histogramme_degres': np.bincount(degres).tolist(),
+    }
+    if n > 0:
+        for q, valeur in zip(QUANTILES, np.quantile(degres, QUANTILES)):
+            stats[f'degre_q{round(q * 100)}'] = float(valeur)
+
+    if rapide:
+        return stats
+
+    # === Composantes connexes ===
+    composantes = composantes_connexes(indptr, indices)
+    tailles = np.bincount(composantes, minlength=n)
+    tailles = tailles[tailles > 0]
+    stats['nb_composantes'] = len(tailles)
+    stats['taille_max_composante'] = int(tailles.max()) if n > 0 else 0
+    valeurs, nombres = np.unique(tailles, return_counts=True)
+    stats['tailles_composantes'] = [[int(t), int(nb)] for t, nb in zip(valeurs[::-1], nombres[::-1])]
+    stats['nb_noeuds_isoles'] = int((degres == 0).sum())
+    stats['est_connexe'] = len(tailles) == 1
+
+    # === Estimations par échantillonnage ===
+    rng = np.random.default_rng(graine)
+    if n > 0:
+        echantillon = rng.choice(n, size=min(nb_echantillons, n), replace=False)
+        stats['clustering_approx'] = estimer_clustering(indptr, indices, echantillon)
+
+        # Sources dans la plus grande composante
+        plus_grande = np.bincount(composantes).argmax()
+        candidats = np.flatnonzero(composantes == plus_grande)
+        sources = rng.choice(candidats, size=min(nb_sources, len(candidats)), replace=False)
+        stats['diametre_approx'] = estimer_diametre(indptr, indices, sources)
+
+    return stats
+
+
+def afficher_statistiques(stats, noeuds, degres, top_k=TOP_K):
+    """
+    Affiche les statistiques du graphe et les top_k utilisateurs les plus connectés.
+    """
+    print("\n" + "="*50)
+    print("       INFORMATIONS DU GRAPHE")
+    print("="*50)
+    print(f"  Nombre de nœuds (utilisateurs): {stats['nb_noeuds']}")
+    print(f"  Nombre d'arêtes (relations):    {stats['nb_aretes']}")
+    print(f"  Degré moyen:                    {stats['degre_moyen']:.2f}")
+    print(f"  Densité du graphe:              {stats['densite']:.4f}")
+    if 'degre_q50' in stats:
+        print(f"  Degré min / médian / max:       {stats['degre_min']} / {stats['degre_q50']:.0f} / {stats['degre_max']}")
+        print(f"  Degré 90e / 99e centile:        {stats['degre_q90']:.0f} / {stats['degre_q99']:.0f}")
+    if 'est_connexe' in stats:
+        print(f"  Graphe connexe:                 {'Oui' if stats['est_connexe'] else 'Non'}")
+        print(f"  Composantes connexes:           {stats['nb_composantes']} (plus grande: {stats['taille_max_composante']})")
+        tailles = ', '.join(f"{taille} ×{nb}" for taille, nb in stats['tailles_composantes'][:NB_TAILLES_AFFICHEES])
+        if len(stats['tailles_composantes']) > NB_TAILLES_AFFICHEES:
+            tailles += ", ..."
+        print(f"  Tailles des composantes:        {tailles}")
+    if 'clustering_approx' in stats:
+        print(f"  Clustering moyen (estimé):      {stats['clustering_approx']:.4f}")
+        print(f"  Diamètre (estimé):              {stats['diametre_approx']}")
+    print("="*50)
+
+    # Afficher seulement les utilisateurs de plus fort degré
+    top_k = min(top_k, len(degres))
+    meilleurs = np.argpartition(-degres, top_k - 1)[:top_k] if top_k > 0 else []
+    meilleurs = sorted(meilleurs, key=lambda i: (-degres[i], i))
+
+    print(f"\n  Utilisateurs les plus connectés ({len(meilleurs)} sur {len(degres)}):")
+    print("  " + "-"*30)
+    for i in meilleurs:
+        print(f"    {noeuds[i]}: {degres[i]} ami(s)")
@@ -12,8 +12,6 @@ import sys
 # Ajouter le chemin parent pour les imports
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from src.graphe import charger_graphe_complet
-from src.louvain import executer_louvain
-from src.girvan_newman import executer_girvan_newman
 
 
 # Couleurs pour les communautés
@@ -199,6 +197,9 @@ def generer_toutes_visualisations(G, partition_louvain, partition_gn, sauvegarde
 
 # === Test du module ===
 if __name__ == "__main__":
+    from src.louvain import executer_louvain
+    from src.girvan_newman import executer_girvan_newman
+    
     # Chemin vers les données
     chemin = os.path.join(os.path.dirname(__file__), "..", "data", "reseau_amis.csv")
     